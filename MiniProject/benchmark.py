@@ -0,0 +1,261 @@
+"""
+benchmark.py
+------------
+Benchmark suite for processors and Pipeline configurations.
+
+Every case runs on a synthetic dataset (see synthetic.py) in a fresh
+worker process, so peak RSS is per case and earlier cases cannot warm
+or pollute the heap for later ones. For each case it reports:
+
+- records/sec (best of --repeat timed runs, metrics disabled)
+- peak RSS of the worker process
+- allocations: peak traced bytes and net live blocks (tracemalloc)
+
+Results can be saved as a JSON baseline and later runs compared
+against it; a case whose throughput drops, or whose peak memory
+grows, by more than --tolerance is reported as a regression and
+the script exits with status 1.
+
+Usage:
+    python benchmark.py [--rows N] [--null-ratio R] [--repeat K] [--only NAME]
+                        [--save-baseline FILE] [--compare FILE] [--tolerance T]
+
+Author: Anupam Bhattacharyya
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from pipeline import Pipeline
+from processors import Cleaner, Transformer, FeatureEngineer, MetricsCalculator
+from synthetic import make_batch, make_records
+
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+
+# ============================================================
+# CASES
+# ============================================================
+
+def _steps():
+    return [Cleaner(), Transformer(multiplier=2), FeatureEngineer(), MetricsCalculator()]
+
+
+def _clean(data):
+    return Cleaner().run(data)
+
+
+def _clean_batch(batch):
+    return Cleaner().run_batch(batch)
+
+
+# name -> (build(rows, null_ratio) -> data, run(data))
+CASES = {
+    # Individual processors (later steps get already-cleaned input)
+    "cleaner": (make_records, lambda data: Cleaner().run(data)),
+    "transformer": (
+        lambda rows, ratio: _clean(make_records(rows, ratio)),
+        lambda data: Transformer(multiplier=2).run(data)
+    ),
+    "feature_engineer": (
+        lambda rows, ratio: _clean(make_records(rows, ratio)),
+        lambda data: FeatureEngineer().run(data)
+    ),
+    "metrics_calculator": (
+        lambda rows, ratio: _clean(make_records(rows, ratio)),
+        lambda data: MetricsCalculator().run(data)
+    ),
+    "cleaner_batch": (make_batch, lambda batch: Cleaner().run_batch(batch)),
+    "transformer_batch": (
+        lambda rows, ratio: _clean_batch(make_batch(rows, ratio)),
+        lambda batch: Transformer(multiplier=2).run_batch(batch)
+    ),
+    "feature_engineer_batch": (
+        lambda rows, ratio: _clean_batch(make_batch(rows, ratio)),
+        lambda batch: FeatureEngineer().run_batch(batch)
+    ),
+    "metrics_calculator_batch": (
+        lambda rows, ratio: _clean_batch(make_batch(rows, ratio)),
+        lambda batch: MetricsCalculator().run_batch(batch)
+    ),
+
+    # Full pipeline configurations. optimize=False keeps every step
+    # (the planner would drop FeatureEngineer), so these cases stay
+    # comparable with baselines saved before the planner existed
+    "pipeline": (make_records, lambda data: Pipeline(_steps(), optimize=False).run(data)),
+    "pipeline_unfused": (
+        make_records,
+        lambda data: Pipeline(_steps(), fuse=False, optimize=False).run(data)
+    ),
+    "pipeline_in_place": (
+        make_records,
+        lambda data: Pipeline(_steps(), in_place=True, optimize=False).run(data)
+    ),
+    "pipeline_streaming": (
+        make_records,
+        lambda data: Pipeline(_steps(), optimize=False).run(data, chunk_size=50_000)
+    ),
+    "pipeline_columnar": (
+        make_batch,
+        lambda batch: Pipeline(_steps(), columnar=True, optimize=False).run(batch)
+    ),
+    "pipeline_optimized": (make_records, lambda data: Pipeline(_steps()).run(data)),
+}
+
+
+# ============================================================
+# MEASUREMENT (runs inside the worker process)
+# ============================================================
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure_case(name, rows, null_ratio, repeat):
+    """
+    Run one case and return its measurements as a dict.
+    """
+    metrics.disable()
+    build, run = CASES[name]
+    data = build(rows, null_ratio)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(data)
+        best = min(best, time.perf_counter() - start)
+
+    # Separate run: tracing slows execution, so it is not timed
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = run(data)
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    live_blocks = sys.getallocatedblocks() - blocks_before
+    del result
+
+    return {
+        "records_per_sec": rows / best if best else float("inf"),
+        "seconds": best,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "peak_alloc_bytes": peak_traced,
+        "live_blocks": live_blocks,
+    }
+
+
+def run_case(name, rows, null_ratio, repeat):
+    """
+    measure_case() in a fresh process (spawn: nothing inherited).
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(measure_case, name, rows, null_ratio, repeat).result()
+
+
+# ============================================================
+# BASELINES
+# ============================================================
+
+def compare(results, baseline, tolerance):
+    """
+    Return a list of regression messages (empty if none).
+
+    Cases missing from the baseline are skipped; baselines recorded
+    with a different dataset are rejected.
+    """
+    if baseline["config"]["rows"] != results["config"]["rows"] \
+            or baseline["config"]["null_ratio"] != results["config"]["null_ratio"]:
+        raise ValueError(
+            f"Baseline was recorded with {baseline['config']}; "
+            f"rerun with the same --rows and --null-ratio"
+        )
+
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            continue
+        if current["records_per_sec"] < previous["records_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: records/s {previous['records_per_sec']:,.0f} -> "
+                f"{current['records_per_sec']:,.0f}"
+            )
+        for key in ("peak_rss_bytes", "peak_alloc_bytes"):
+            if current[key] > previous[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {previous[key] / 1e6:.1f} MB -> {current[key] / 1e6:.1f} MB"
+                )
+    return regressions
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--null-ratio", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", action="append", default=None,
+                        help="run only cases whose name contains this (repeatable)")
+    parser.add_argument("--save-baseline", metavar="FILE", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--compare", metavar="FILE", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [
+        name for name in CASES
+        if not args.only or any(part in name for part in args.only)
+    ]
+
+    results = {
+        "config": {"rows": args.rows, "null_ratio": args.null_ratio, "repeat": args.repeat},
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "cases": {},
+    }
+
+    print(f"rows={args.rows:,}  null_ratio={args.null_ratio}  repeat={args.repeat}")
+    print(f"{'case':<26} {'records/s':>12} {'peak RSS MB':>12} {'alloc MB':>9} {'live blocks':>12}")
+    for name in names:
+        case = results["cases"][name] = run_case(name, args.rows, args.null_ratio, args.repeat)
+        print(
+            f"{name:<26} {case['records_per_sec']:>12,.0f} "
+            f"{case['peak_rss_bytes'] / 1e6:>12.1f} {case['peak_alloc_bytes'] / 1e6:>9.1f} "
+            f"{case['live_blocks']:>12,}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"REGRESSIONS (tolerance {args.tolerance:.0%}):")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+benchmark_memory.py
+-------------------
+Memory benchmark: dict-per-record vs columnar RecordBatch.
+
+For each layout it reports:
+- bytes held by the dataset itself
+- peak bytes while running Cleaner -> Transformer -> FeatureEngineer
+
+Measured with tracemalloc (NumPy reports its buffers to it).
+
+Usage:
+    python benchmark_memory.py [rows]      # default 10_000_000
+
+Author: Anupam Bhattacharyya
+"""
+
+import sys
+import tracemalloc
+
+import metrics
+from pipeline import Pipeline
+from processors import Cleaner, Transformer, FeatureEngineer
+from synthetic import make_batch, make_records
+
+
+def measure(build, columnar):
+    """
+    Return (dataset_bytes, pipeline_peak_bytes) for one layout.
+    """
+    tracemalloc.start()
+    data = build()
+    dataset_bytes = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.reset_peak()
+    pipeline = Pipeline([Cleaner(), Transformer(multiplier=2), FeatureEngineer()],
+                        columnar=columnar)
+    result = pipeline.run(data)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    del data, result
+    return dataset_bytes, peak_bytes
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    metrics.disable()
+    make_batch(1)  # import NumPy now so its own allocations are not counted
+
+    print(f"rows={rows:,}")
+    print(f"{'layout':<12} {'dataset MB':>11} {'bytes/row':>10} {'pipeline peak MB':>17}")
+
+    for name, build, columnar in (
+        ("dict", lambda: make_records(rows), False),
+        ("RecordBatch", lambda: make_batch(rows), True),
+    ):
+        dataset_bytes, peak_bytes = measure(build, columnar)
+        print(f"{name:<12} {dataset_bytes / 1e6:>11.1f} {dataset_bytes / rows:>10.1f} "
+              f"{peak_bytes / 1e6:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+benchmark_parallel.py
+---------------------
+Scaling benchmark for sharded pipeline execution.
+
+Runs the same pipeline with ProcessExecutor(1 .. N workers)
+and reports wall time, records/sec and speedup vs 1 worker.
+
+Usage:
+    python benchmark_parallel.py [rows] [max_workers]
+
+Author: Anupam Bhattacharyya
+"""
+
+import os
+import sys
+import time
+
+import metrics
+from executors import ProcessExecutor
+from pipeline import Pipeline
+from processors import Cleaner, Transformer, FeatureEngineer, MetricsCalculator
+from synthetic import make_records
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    data = make_records(rows)
+    metrics.disable()
+
+    print(f"rows={rows:,}  cpus={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'records/s':>12} {'speedup':>8}")
+
+    baseline = None
+    for workers in worker_counts(max_workers):
+        shard_size = max(1, rows // (workers * 4))
+        # optimize=False: keep FeatureEngineer, so the two-pass shard
+        # path (partial / merge / apply) is what gets measured
+        pipeline = Pipeline(
+            steps=[Cleaner(), Transformer(multiplier=2), FeatureEngineer(), MetricsCalculator()],
+            executor=ProcessExecutor(max_workers=workers),
+            optimize=False
+        )
+
+        # Warm up the pool so process start-up is not measured
+        pipeline.run(data[:workers], chunk_size=1)
+
+        start = time.perf_counter()
+        pipeline.run(data, chunk_size=shard_size)
+        elapsed = time.perf_counter() - start
+        pipeline.executor.shutdown()
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.3f} {rows / elapsed:>12,.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+benchmark_startup.py
+--------------------
+Startup-time benchmark: how long a fresh interpreter takes to get
+a runnable pipeline, and how many modules it loads on the way.
+
+Each scenario runs in a new `python -c` process (--runs times) and
+the median wall time is reported, so import caches of one run do
+not help the next.
+
+Usage:
+    python benchmark_startup.py [--runs N] [--config FILE]
+
+Author: Anupam Bhattacharyya
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = {
+    "interpreter only": "pass",
+    "import pipeline": "import pipeline",
+    "config pipeline": "import pipeline; pipeline.Pipeline.from_config({config!r})",
+    "config pipeline (columnar)":
+        "import pipeline, config; "
+        "options = config.load_config({config!r}); options['columnar'] = True; "
+        "pipeline.Pipeline.from_config(options).run([{{'id': 1, 'value': 1}}])",
+    "hard-coded steps (import processors)":
+        "import pipeline, processors; "
+        "pipeline.Pipeline([processors.Cleaner(), processors.Transformer(multiplier=2), "
+        "processors.FeatureEngineer(), processors.MetricsCalculator()])",
+    "import main": "import main",
+}
+
+
+def time_snippet(code, runs):
+    """
+    Return (median seconds, modules loaded) for a python -c snippet.
+    """
+    script = f"{code}\nimport sys; print(len(sys.modules))"
+    env = dict(os.environ, PYTHONPATH=HERE, PIPELINE_METRICS="0")
+
+    timings, modules = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=HERE, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(time.perf_counter() - start)
+        modules = int(output.split()[-1])
+    return statistics.median(timings), modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline startup-time benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--config", default=os.path.join(HERE, "pipeline.json"))
+    args = parser.parse_args(argv)
+
+    print(f"runs={args.runs}  config={os.path.basename(args.config)}")
+    print(f"{'scenario':<38} {'median ms':>10} {'modules':>8}")
+    for name, code in SCENARIOS.items():
+        seconds, modules = time_snippet(code.format(config=args.config), args.runs)
+        print(f"{name:<38} {seconds * 1000:>10.1f} {modules:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+cache.py
+--------
+Bounded in-memory cache decorator for sync and async functions.
+
+Features:
+- LRU eviction by number of entries and/or approximate bytes
+- Optional TTL per entry
+- Keys built from positional AND keyword arguments
+- hit / miss / eviction / expiration counters (cache_info());
+  callers that join an in-flight computation count as hits
+- Single-flight: concurrent callers of the same key share one
+  computation instead of all calling the upstream
+- Thread-safe for sync functions, asyncio-safe for async ones;
+  async single-flight is per event loop, and a cancelled caller
+  never cancels the shared computation for the others
+
+Author: Anupam Bhattacharyya
+"""
+
+import asyncio
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+from functools import wraps
+
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    ["hits", "misses", "evictions", "expirations", "currsize", "currbytes"]
+)
+
+_KWARGS_MARK = object()
+
+
+def make_key(args, kwargs):
+    """
+    Hashable key from call arguments (kwargs order does not matter).
+    """
+    if not kwargs:
+        return args
+    return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+class _Store:
+    """
+    Ordered entry store with LRU + TTL eviction.
+
+    Not thread-safe on its own; callers hold the lock.
+    """
+
+    def __init__(self, maxsize, max_bytes, ttl, sizeof):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.entries = OrderedDict()  # key -> (value, expires_at, size)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        """
+        Return (True, value) on a live entry, (False, None) otherwise.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            value, expires_at, _ = entry
+            if expires_at is None or time.monotonic() < expires_at:
+                self.entries.move_to_end(key)
+                return True, value
+            self._remove(key)
+            self.expirations += 1
+        return False, None
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # would evict everything else; just don't cache it
+
+        if key in self.entries:
+            self._remove(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self.entries[key] = (value, expires_at, size)
+        self.bytes += size
+
+        while (
+            (self.maxsize is not None and len(self.entries) > self.maxsize)
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def info(self):
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.expirations,
+            len(self.entries), self.bytes
+        )
+
+
+def _retrieve_exception(task):
+    """
+    Mark a failed flight as retrieved if every caller was cancelled.
+    """
+    if not task.cancelled():
+        task.exception()
+
+
+def cached(maxsize=128, ttl=None, max_bytes=None, sizeof=sys.getsizeof):
+    """
+    Cache results of a sync or async function.
+
+    maxsize:   max number of entries (None = unbounded by count)
+    ttl:       seconds an entry stays valid (None = forever)
+    max_bytes: max total size as measured by sizeof(value)
+               (shallow sys.getsizeof by default; pass a deeper
+               estimator for nested values)
+
+    Exceptions are never cached. Every caller gets the same cached
+    object, so callers must not mutate it. The wrapper exposes
+    cache_info() and cache_clear().
+    """
+    def decorator(func):
+        store = _Store(maxsize, max_bytes, ttl, sizeof)
+        lock = threading.Lock()
+        in_flight = {}  # key (or (loop, key)) -> shared Future / Task
+
+        if inspect.iscoroutinefunction(func):
+            async def compute(flight_key, key, args, kwargs):
+                try:
+                    value = await func(*args, **kwargs)
+                    with lock:
+                        store.put(key, value)
+                    return value
+                finally:
+                    with lock:
+                        in_flight.pop(flight_key, None)
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                # Tasks belong to one event loop, so flights are per loop.
+                flight_key = (asyncio.get_running_loop(), key)
+                with lock:
+                    found, value = store.get(key)
+                    if found:
+                        store.hits += 1
+                        return value
+                    task = in_flight.get(flight_key)
+                    if task is None:
+                        store.misses += 1
+                        task = in_flight[flight_key] = asyncio.ensure_future(
+                            compute(flight_key, key, args, kwargs)
+                        )
+                        task.add_done_callback(_retrieve_exception)
+                    else:
+                        store.hits += 1
+
+                # The computation is its own task: cancelling one caller
+                # (even the one that started it) never cancels the others.
+                return await asyncio.shield(task)
+            wrapper = async_wrapper
+
+        else:
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                with lock:
+                    found, value = store.get(key)
+                    if found:
+                        store.hits += 1
+                        return value
+                    future = in_flight.get(key)
+                    leader = future is None
+                    if leader:
+                        store.misses += 1
+                        future = in_flight[key] = Future()
+                    else:
+                        store.hits += 1
+
+                if not leader:
+                    return future.result()
+
+                try:
+                    value = func(*args, **kwargs)
+                except BaseException as exc:
+                    future.set_exception(exc)
+                    raise
+                else:
+                    with lock:
+                        store.put(key, value)
+                    future.set_result(value)
+                    return value
+                finally:
+                    with lock:
+                        in_flight.pop(key, None)
+            wrapper = sync_wrapper
+
+        def cache_info():
+            with lock:
+                return store.info()
+
+        def cache_clear():
+            with lock:
+                store.clear()
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
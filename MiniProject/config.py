@@ -0,0 +1,148 @@
+"""
+config.py
+---------
+Declarative pipeline configuration.
+
+A pipeline is described by a mapping, usually loaded from a JSON,
+TOML or YAML file:
+
+    {
+      "columnar": false,
+      "step_cache": true,
+      "steps": [
+        "processors.Cleaner",
+        {"class": "processors.Transformer", "params": {"multiplier": 2}},
+        "processors.FeatureEngineer",
+        "processors.MetricsCalculator"
+      ]
+    }
+
+Steps, executors and hooks are given as "module.Class" paths (plus
+optional params) and are only imported when the pipeline is built,
+so a CLI only loads the processor modules its pipeline actually uses.
+
+Build with Pipeline.from_config(path_or_mapping).
+
+Author: Anupam Bhattacharyya
+"""
+
+import importlib
+import json
+import os
+
+
+PIPELINE_FLAGS = ("columnar", "fuse", "in_place", "optimize")
+PIPELINE_VALUES = ("memory_budget", "spill_dir")  # passed through as given
+PIPELINE_KEYS = PIPELINE_FLAGS + PIPELINE_VALUES + ("steps", "step_cache", "executor", "hooks")
+
+
+# ============================================================
+# LOADING
+# ============================================================
+
+def _load_toml(file):
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError(
+                "TOML configs need Python 3.11+ or: pip install tomli"
+            ) from None
+    return tomllib.load(file)
+
+
+def _load_yaml(file):
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML configs need PyYAML. Install it with: pip install pyyaml") from None
+    return yaml.safe_load(file)
+
+
+LOADERS = {
+    ".json": json.load,
+    ".toml": _load_toml,
+    ".yaml": _load_yaml,
+    ".yml": _load_yaml,
+}
+
+
+def load_config(path):
+    """
+    Read a config file; the format is chosen by file extension.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in LOADERS:
+        raise ValueError(
+            f"Unsupported config format: {path} (expected one of {', '.join(LOADERS)})"
+        )
+    with open(path, "rb") as file:
+        config = LOADERS[extension](file)
+
+    if not isinstance(config, dict):
+        raise ValueError(f"Pipeline config must be a mapping: {path}")
+    return config
+
+
+# ============================================================
+# BUILDING
+# ============================================================
+
+def import_object(path):
+    """
+    Import "package.module.Name" (or "package.module:Name").
+    """
+    module_name, sep, attribute = path.rpartition(":") if ":" in path else path.rpartition(".")
+    if not sep or not module_name:
+        raise ValueError(f"Expected 'module.Name', got: {path!r}")
+
+    module = importlib.import_module(module_name)
+    try:
+        return getattr(module, attribute)
+    except AttributeError:
+        raise ImportError(f"Module {module_name!r} has no attribute {attribute!r}") from None
+
+
+def build_object(spec):
+    """
+    Instantiate "module.Class" or {"class": ..., "params": {...}}.
+    """
+    if isinstance(spec, str):
+        spec = {"class": spec}
+    if not isinstance(spec, dict) or "class" not in spec:
+        raise ValueError(f"Expected a class path or {{'class': ..., 'params': ...}}, got: {spec!r}")
+
+    unknown = set(spec) - {"class", "params"}
+    if unknown:
+        raise ValueError(f"Unknown keys for {spec['class']}: {sorted(unknown)}")
+    return import_object(spec["class"])(**spec.get("params", {}))
+
+
+def pipeline_options(config):
+    """
+    Turn a config mapping into Pipeline(...) keyword arguments.
+
+    step_cache may be true (default StepCache) or a mapping of
+    StepCache params.
+    """
+    unknown = set(config) - set(PIPELINE_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown pipeline config keys: {sorted(unknown)}")
+    if not config.get("steps"):
+        raise ValueError("Pipeline config needs a non-empty 'steps' list")
+
+    options = {name: bool(config[name]) for name in PIPELINE_FLAGS if name in config}
+    options.update((name, config[name]) for name in PIPELINE_VALUES if name in config)
+    options["steps"] = [build_object(spec) for spec in config["steps"]]
+    options["hooks"] = [build_object(spec) for spec in config.get("hooks", [])]
+
+    if config.get("executor"):
+        options["executor"] = build_object(config["executor"])
+
+    step_cache = config.get("step_cache")
+    if step_cache:
+        params = step_cache if isinstance(step_cache, dict) else {}
+        options["step_cache"] = build_object({"class": "step_cache.StepCache", "params": params})
+    return options
@@ -1,42 +1,320 @@
 """
 decorators.py
 -------------
-Reusable decorators for logging and timing.
+Reusable decorators for logging, timing and retries.
 
 Used across:
 - ingestion
 - pipeline
 - processors
 
+Both decorators feed the metrics registry (see metrics.py) and log
+through the standard logging module instead of print, so output
+can be silenced or redirected without touching business logic.
+
+Coroutine functions and async generators get async wrappers, so
+the measured time is the real awaited time, not just the time to
+create the coroutine object.
+
 Author: Anupam Bhattacharyya
 """
 
+import asyncio
+import inspect
+import logging
+import random
+import threading
 import time
+from contextlib import aclosing
 from functools import wraps
 
+import metrics
+
+
+logger = logging.getLogger("pipeline")
+
 
 def log_execution(func):
     """
-    Logs when a function starts and finishes.
+    Logs when a function starts and finishes and counts calls.
     """
+    if not metrics.is_enabled():
+        return func
+
+    name = func.__qualname__
+
+    if inspect.isasyncgenfunction(func):
+        @wraps(func)
+        async def agen_wrapper(*args, **kwargs):
+            if metrics.is_enabled():
+                metrics.REGISTRY.count_call(name)
+                logger.info("[LOG] Started: %s", name)
+            async with aclosing(func(*args, **kwargs)) as items:
+                async for item in items:
+                    yield item
+            if metrics.is_enabled():
+                logger.info("[LOG] Finished: %s", name)
+        return agen_wrapper
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not metrics.is_enabled():
+                return await func(*args, **kwargs)
+
+            metrics.REGISTRY.count_call(name)
+            logger.info("[LOG] Started: %s", name)
+            result = await func(*args, **kwargs)
+            logger.info("[LOG] Finished: %s", name)
+            return result
+        return async_wrapper
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        print(f"[LOG] Started: {func.__name__}")
+        if not metrics.is_enabled():
+            return func(*args, **kwargs)
+
+        metrics.REGISTRY.count_call(name)
+        logger.info("[LOG] Started: %s", name)
         result = func(*args, **kwargs)
-        print(f"[LOG] Finished: {func.__name__}")
+        logger.info("[LOG] Finished: %s", name)
         return result
     return wrapper
 
 
 def timing(func):
     """
-    Measures execution time of a function.
+    Measures execution time of a function (perf_counter_ns).
+
+    For async generators it also records time-to-first-record
+    under "<name>.first_record".
     """
+    if not metrics.is_enabled():
+        return func
+
+    name = func.__qualname__
+
+    if inspect.isasyncgenfunction(func):
+        @wraps(func)
+        async def agen_wrapper(*args, **kwargs):
+            if not metrics.is_enabled():
+                async with aclosing(func(*args, **kwargs)) as items:
+                    async for item in items:
+                        yield item
+                return
+
+            start = time.perf_counter_ns()
+            first = True
+            try:
+                async with aclosing(func(*args, **kwargs)) as items:
+                    async for item in items:
+                        if first:
+                            first = False
+                            metrics.REGISTRY.observe_latency(
+                                f"{name}.first_record", time.perf_counter_ns() - start
+                            )
+                        yield item
+            finally:
+                _observe_time(name, time.perf_counter_ns() - start)
+        return agen_wrapper
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not metrics.is_enabled():
+                return await func(*args, **kwargs)
+
+            start = time.perf_counter_ns()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _observe_time(name, time.perf_counter_ns() - start)
+        return async_wrapper
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        print(f"[TIME] {func.__name__}: {end - start:.2f}s")
-        return result
+        if not metrics.is_enabled():
+            return func(*args, **kwargs)
+
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _observe_time(name, time.perf_counter_ns() - start)
     return wrapper
+
+
+def _observe_time(name, elapsed_ns):
+    metrics.REGISTRY.observe_latency(name, elapsed_ns)
+    logger.info("[TIME] %s: %.3fms", name, elapsed_ns / 1e6)
+
+
+# ============================================================
+# RETRY WITH BACKOFF + CIRCUIT BREAKER
+# ============================================================
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling an upstream whose circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream for a while.
+
+    - closed:    calls go through; consecutive failures are counted
+    - open:      after failure_threshold failures, calls fail fast
+                 with CircuitOpenError for reset_timeout seconds
+    - half-open: after the timeout a single trial call is let
+                 through (concurrent callers still fail fast); its
+                 success closes the circuit, its failure re-opens it
+    """
+
+    def __init__(self, name="circuit", failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = None  # token of the half-open trial call in flight
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError unless the call may go through.
+
+        Returns a token if the call is the half-open trial (else
+        None); pass it to end_trial() once the call is over.
+        """
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial is not None):
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            if state == "half-open":
+                self._trial = object()
+                return self._trial
+            return None
+
+    def end_trial(self, token):
+        """
+        Let another trial through if this one recorded no outcome
+        (e.g. it was cancelled or failed with a non-retryable error).
+        """
+        with self._lock:
+            if self._trial is token:
+                self._trial = None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            state = self.state
+            if state == "half-open" or self.failures >= self.failure_threshold:
+                if state != "open":
+                    logger.warning("[CIRCUIT] %s opened after %d failures", self.name, self.failures)
+                self.opened_at = time.monotonic()
+            self._trial = None
+
+
+def backoff_delay(attempt, base_delay, max_delay, jitter=True):
+    """
+    Exponential backoff for the given attempt (1-based).
+
+    With jitter, the delay is drawn uniformly from [0, backoff]
+    ("full jitter") so retries from many callers do not line up.
+    """
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return random.uniform(0, delay) if jitter else delay
+
+
+def retry(max_attempts=3, base_delay=0.1, max_delay=10.0, retry_on=(Exception,),
+          deadline=None, breaker=None, jitter=True):
+    """
+    Retries a sync or async function on failure.
+
+    - max_attempts: total attempts including the first
+    - retry_on:     exception types worth retrying; anything else
+                    is raised immediately
+    - deadline:     seconds for the whole call including retries
+                    (async attempts are cancelled when it expires)
+    - breaker:      optional CircuitBreaker shared by all calls
+    """
+    retry_on = tuple(retry_on)
+
+    def decorator(func):
+        name = func.__qualname__
+
+        def should_retry(exc, attempt, started):
+            if breaker is not None and isinstance(exc, retry_on):
+                breaker.record_failure()
+            if not isinstance(exc, retry_on) or attempt == max_attempts:
+                return None
+
+            delay = backoff_delay(attempt, base_delay, max_delay, jitter)
+            if deadline is not None and time.monotonic() - started + delay >= deadline:
+                return None
+
+            metrics.REGISTRY.count_call(f"{name}.retry")
+            logger.warning("[RETRY] %s attempt %d failed: %r", name, attempt, exc)
+            return delay
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.monotonic()
+                for attempt in range(1, max_attempts + 1):
+                    trial = breaker.before_call() if breaker is not None else None
+                    timeout = None
+                    if deadline is not None:
+                        timeout = max(0.0, deadline - (time.monotonic() - started))
+                    try:
+                        result = await asyncio.wait_for(func(*args, **kwargs), timeout)
+                    except Exception as exc:
+                        delay = should_retry(exc, attempt, started)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                    else:
+                        if breaker is not None:
+                            breaker.record_success()
+                        return result
+                    finally:
+                        if trial is not None:
+                            breaker.end_trial(trial)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            for attempt in range(1, max_attempts + 1):
+                trial = breaker.before_call() if breaker is not None else None
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as exc:
+                    delay = should_retry(exc, attempt, started)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                else:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return result
+                finally:
+                    if trial is not None:
+                        breaker.end_trial(trial)
+        return wrapper
+    return decorator
@@ -0,0 +1,192 @@
+"""
+dedup.py
+--------
+Deduplication / merge of records by id.
+
+Overlapping sources return the same id more than once; without
+dedup every downstream step processes those records twice.
+
+- Deduplicator: in-memory hash index on the key field
+- ExternalDeduplicator: same result with bounded memory for huge
+  inputs (hash-partitioned spill files, then a streaming merge)
+
+Conflict resolution (resolve=):
+- "latest":         a later record replaces the earlier one
+- "first":          the first record wins, later ones are dropped
+- "first_non_null": fields are merged; for each field the first
+                    non-None value wins
+- any callable(kept, new) -> merged record
+
+Output keeps the order in which each id was first seen. Records
+without the key field are passed through untouched.
+
+A Bloom filter was not used for the bounded variant: its false
+positives would silently drop or merge records with unique ids.
+
+Author: Anupam Bhattacharyya
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+
+from decorators import log_execution
+from records import RecordBatch
+from serialization import iter_ndjson, write_ndjson
+
+
+def _latest(kept, new):
+    return new
+
+
+def _first(kept, new):
+    return kept
+
+
+def _first_non_null(kept, new):
+    merged = dict(kept)
+    for name, value in new.items():
+        if merged.get(name) is None:
+            merged[name] = value
+    return merged
+
+
+RESOLVERS = {
+    "latest": _latest,
+    "first": _first,
+    "first_non_null": _first_non_null,
+}
+
+
+def get_resolver(resolve):
+    if callable(resolve):
+        return resolve
+    if resolve not in RESOLVERS:
+        raise ValueError(f"Unknown conflict resolution {resolve!r}; use one of {list(RESOLVERS)}")
+    return RESOLVERS[resolve]
+
+
+class Deduplicator:
+    """
+    Keeps one record per key value, merged with resolve.
+
+    Usable as a pipeline step (run / run_batch) or incrementally:
+    add() the records of each source, then records().
+    """
+
+    def __init__(self, key="id", resolve="latest"):
+        self.key = key
+        self.resolve = resolve
+        self._resolve = get_resolver(resolve)
+        self.index = {}  # key value -> merged record, in first-seen order
+        self.duplicates = 0
+
+    def add(self, records):
+        """
+        Index records; return the ones whose key was not seen before.
+        """
+        index, key, resolve = self.index, self.key, self._resolve
+        fresh = []
+        for item in records:
+            value = item.get(key)
+            if value is None:
+                index[object()] = item  # no key: always unique
+                fresh.append(item)
+            elif value in index:
+                index[value] = resolve(index[value], item)
+                self.duplicates += 1
+            else:
+                index[value] = item
+                fresh.append(item)
+        return fresh
+
+    def records(self):
+        return list(self.index.values())
+
+    def reset(self):
+        self.index, self.duplicates = {}, 0
+
+    @log_execution
+    def run(self, data):
+        self.reset()
+        self.add(data)
+        result = self.records()
+        self.reset()
+        return result
+
+    @log_execution
+    def run_batch(self, batch):
+        # Merging policies are per record: go through dicts
+        return RecordBatch.from_records(self.run(batch.to_records()))
+
+
+class ExternalDeduplicator:
+    """
+    Memory-bounded Deduplicator for inputs larger than RAM.
+
+    Records are hash-partitioned on the key into `partitions` NDJSON
+    spill files (tagged with their input position), each partition
+    is deduplicated in memory on its own, and the partitions are
+    merged back in first-seen order. Peak memory is about one
+    partition: pick partitions ~ input size / memory available.
+    """
+
+    def __init__(self, key="id", resolve="latest", partitions=64, spill_dir=None):
+        self.key = key
+        self.resolve = resolve
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+
+    def iter_unique(self, records):
+        """
+        Lazily yield the deduplicated records of an iterable.
+        """
+        directory = tempfile.mkdtemp(prefix="dedup-", dir=self.spill_dir)
+        files = []
+        try:
+            inputs = self._partition(records, directory)
+            outputs = [self._dedup_partition(path) for path in inputs]
+            # Each partition output is sorted by first-seen position
+            files = [open(path, "rb") for path in outputs]
+            streams = [iter_ndjson(file) for file in files]
+            for _, item in heapq.merge(*streams, key=lambda pair: pair[0]):
+                yield item
+        finally:
+            for file in files:
+                file.close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _partition(self, records, directory):
+        paths = [os.path.join(directory, f"in-{n}.ndjson") for n in range(self.partitions)]
+        files = [open(path, "wb") for path in paths]
+        try:
+            for position, item in enumerate(records):
+                file = files[hash(item.get(self.key)) % self.partitions]
+                write_ndjson(file, [[position, item]])
+        finally:
+            for file in files:
+                file.close()
+        return paths
+
+    def _dedup_partition(self, path):
+        index, resolve = {}, get_resolver(self.resolve)
+        with open(path, "rb") as file:
+            for position, item in iter_ndjson(file):
+                value = item.get(self.key)
+                if value is None:
+                    index[object()] = [position, item]
+                elif value in index:
+                    index[value][1] = resolve(index[value][1], item)
+                else:
+                    index[value] = [position, item]
+        os.remove(path)
+
+        out_path = f"{path}.unique"
+        with open(out_path, "wb") as file:
+            write_ndjson(file, sorted(index.values(), key=lambda pair: pair[0]))
+        return out_path
+
+    @log_execution
+    def run(self, data):
+        return list(self.iter_unique(data))
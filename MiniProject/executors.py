@@ -0,0 +1,97 @@
+"""
+executors.py
+------------
+Pluggable executors for sharded pipeline runs and DAG branches.
+
+An executor only needs one method:
+
+    map(fn, tasks) -> results in task order
+
+so Pipeline does not care whether shards run in the current
+process, in a pool of threads or in a pool of worker processes.
+
+Author: Anupam Bhattacharyya
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class SerialExecutor:
+    """
+    Runs every shard in the current process (baseline / debugging).
+    """
+
+    max_workers = 1
+
+    def map(self, fn, tasks):
+        return [fn(task) for task in tasks]
+
+    def shutdown(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class ThreadExecutor:
+    """
+    Runs tasks on a pool of threads in the current process.
+
+    Nothing is pickled, so it suits steps that release the GIL
+    (NumPy / columnar mode) or wait on I/O. The pool is created on
+    first use and reused until shutdown().
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+
+    def map(self, fn, tasks):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return list(self._pool.map(fn, tasks))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class ProcessExecutor:
+    """
+    Runs shards on a pool of worker processes.
+
+    CPU-bound steps are not limited by the GIL here, at the cost of
+    pickling each shard to and from the workers. The pool is created
+    on first use and reused until shutdown().
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+
+    def map(self, fn, tasks):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return list(self._pool.map(fn, tasks))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
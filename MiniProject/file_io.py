@@ -0,0 +1,354 @@
+"""
+file_io.py
+----------
+File-backed sources and sinks for large local extracts.
+
+Sources memory-map the file and yield chunks lazily, so only one
+chunk of Python objects is alive at a time and RSS stays bounded
+however large the file is:
+
+- CsvSource:      header row + records (lists of dicts)
+- NdjsonSource:   one JSON object per line (lists of dicts, or typed
+                  RecordBatches with a serialization.RecordSchema)
+- ColumnarSource: binary columnar files (RecordBatch views straight
+                  onto the mapped pages, no copy)
+
+Every source can be iterated more than once (two-pass steps re-read
+the file instead of buffering it), is understood by
+Pipeline.run / stream (chunk_size applies) and is also an async
+iterable of chunks for Pipeline.arun.
+
+Sinks take the chunks Pipeline.write() produces:
+CsvSink, NdjsonSink, ColumnarSink. Files are written to a temporary
+name and renamed on close, so readers never see partial output.
+
+Columnar file layout (little-endian, one block per written chunk):
+
+    MAGIC
+    block:  uint64 header length | JSON header | pad to 64 bytes
+            column arrays and null mask, each 64-byte aligned
+
+The header lists rows, field names, dtypes and byte offsets.
+Only fixed-width NumPy dtypes are stored (numbers, bool, fixed
+length strings).
+
+Author: Anupam Bhattacharyya
+"""
+
+import asyncio
+import csv
+import json
+import mmap
+import os
+import struct
+from itertools import islice
+
+from records import RecordBatch, _require_numpy
+from serialization import iter_ndjson, write_ndjson
+
+
+DEFAULT_CHUNK_SIZE = 10_000
+MAGIC = b"PIPECOL1"
+ALIGNMENT = 64
+_LENGTH = struct.Struct("<Q")
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def _map_file(path):
+    """
+    Read-only mmap of path, or None for an empty file (mmap cannot
+    map zero bytes).
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _mapped_lines(path):
+    mapped = _map_file(path)
+    if mapped is None:
+        return
+    try:
+        yield from iter(mapped.readline, b"")
+    finally:
+        mapped.close()
+
+
+def parse_scalar(text):
+    """
+    CSV cell -> None (empty), int, float or the original string.
+    """
+    if text == "":
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+# ============================================================
+# SOURCES
+# ============================================================
+
+class FileSource:
+    """
+    Base class: subclasses implement iter_chunks(chunk_size).
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def iter_chunks(self, chunk_size=None):
+        raise NotImplementedError
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    async def __aiter__(self):
+        # Parse chunks in a worker thread so the event loop stays free
+        loop = asyncio.get_running_loop()
+        chunks, done = self.iter_chunks(), object()
+        while (chunk := await loop.run_in_executor(None, next, chunks, done)) is not done:
+            yield chunk
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path!r})"
+
+
+class CsvSource(FileSource):
+    """
+    CSV file with a header row. Cells are converted by parse_scalar
+    unless converters maps a field name to its own callable.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, converters=None, **csv_options):
+        super().__init__(path, chunk_size)
+        self.converters = converters or {}
+        self.csv_options = csv_options
+
+    def iter_chunks(self, chunk_size=None):
+        chunk_size = chunk_size or self.chunk_size
+        lines = (line.decode() for line in _mapped_lines(self.path))
+        reader = csv.reader(lines, **self.csv_options)
+
+        header = next(reader, None)
+        if header is None:
+            return
+        convert = [self.converters.get(name, parse_scalar) for name in header]
+
+        while rows := list(islice(reader, chunk_size)):
+            yield [
+                {name: func(cell) for name, func, cell in zip(header, convert, row)}
+                for row in rows
+            ]
+
+
+class NdjsonSource(FileSource):
+    """
+    Newline-delimited JSON: one record object per line, decoded
+    with the fastest installed backend (see serialization.py).
+
+    With a schema (serialization.RecordSchema) chunks are decoded
+    straight into typed RecordBatches.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, schema=None):
+        super().__init__(path, chunk_size)
+        self.schema = schema
+
+    def iter_chunks(self, chunk_size=None):
+        chunk_size = chunk_size or self.chunk_size
+        lines = (line for line in _mapped_lines(self.path) if line.strip())
+        while block := list(islice(lines, chunk_size)):
+            if self.schema is not None:
+                yield self.schema.decode_batch(block)
+            else:
+                yield list(iter_ndjson(block))
+
+
+class ColumnarSource(FileSource):
+    """
+    Binary columnar file (see ColumnarSink). Yields RecordBatches
+    whose arrays are read-only views onto the memory-mapped file.
+    """
+
+    def iter_chunks(self, chunk_size=None):
+        chunk_size = chunk_size or self.chunk_size
+        for batch in read_columnar_blocks(self.path):
+            for start in range(0, len(batch), chunk_size):
+                yield batch.slice(start, start + chunk_size)
+
+
+def read_columnar_blocks(path):
+    """
+    Yield one zero-copy RecordBatch per block of a columnar file.
+
+    The mapping stays open as long as any yielded array is alive.
+    """
+    np = _require_numpy()
+    mapped = _map_file(path)
+    if mapped is None or mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a columnar pipeline file: {path}")
+
+    offset = len(MAGIC)
+    while offset < len(mapped):
+        (header_length,) = _LENGTH.unpack_from(mapped, offset)
+        offset += _LENGTH.size
+        header = json.loads(mapped[offset:offset + header_length])
+        offset += header_length
+        offset += _padding(offset)
+
+        rows = header["rows"]
+        columns = {
+            column["name"]: np.frombuffer(
+                mapped, dtype=column["dtype"], count=rows, offset=offset + column["offset"]
+            )
+            for column in header["columns"]
+        }
+        null_mask = np.frombuffer(
+            mapped, dtype=bool, count=rows, offset=offset + header["null_mask"]
+        )
+        offset += header["nbytes"]
+        yield RecordBatch(columns, null_mask)
+
+
+def open_source(path, **options):
+    """
+    Pick a source class from the file extension.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    sources = {".csv": CsvSource, ".ndjson": NdjsonSource, ".jsonl": NdjsonSource,
+               ".pcol": ColumnarSource}
+    if extension not in sources:
+        raise ValueError(f"No file source for {path} (expected one of {', '.join(sources)})")
+    return sources[extension](path, **options)
+
+
+# ============================================================
+# SINKS
+# ============================================================
+
+class FileSink:
+    """
+    Base class: writes to path + ".tmp", renamed to path on close().
+
+    Subclasses implement _open() and write(chunk).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._tmp_path = f"{path}.tmp"
+        self._file = self._open(self._tmp_path)
+
+    def _open(self, path):
+        return open(path, "wb")
+
+    def write(self, chunk):
+        raise NotImplementedError
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _as_records(chunk):
+    return chunk.to_records() if isinstance(chunk, RecordBatch) else chunk
+
+
+class NdjsonSink(FileSink):
+
+    def write(self, chunk):
+        self.rows += write_ndjson(self._file, chunk)
+
+
+class CsvSink(FileSink):
+    """
+    CSV with a header row. fields defaults to the first chunk's
+    fields; None is written as an empty cell.
+    """
+
+    def __init__(self, path, fields=None):
+        self.fields = fields
+        self._writer = None
+        super().__init__(path)
+
+    def _open(self, path):
+        return open(path, "w", newline="")
+
+    def write(self, chunk):
+        records = _as_records(chunk)
+        if self._writer is None:
+            if self.fields is None:
+                self.fields = list(dict.fromkeys(key for item in records for key in item))
+            self._writer = csv.DictWriter(self._file, self.fields, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerows(records)
+        self.rows += len(records)
+
+
+class ColumnarSink(FileSink):
+    """
+    Binary columnar file; each write() appends one block.
+    """
+
+    def _open(self, path):
+        file = open(path, "wb")
+        file.write(MAGIC)
+        return file
+
+    def write(self, chunk):
+        batch = chunk if isinstance(chunk, RecordBatch) else RecordBatch.from_records(chunk)
+        if not len(batch):
+            return
+
+        np = _require_numpy()
+        arrays, columns, offset = [], [], 0
+        for name, array in batch.columns.items():
+            if array.dtype.hasobject:
+                raise TypeError(f"Column {name!r} has no fixed-width dtype ({array.dtype})")
+            array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+            columns.append({"name": name, "dtype": array.dtype.str, "offset": offset})
+            arrays.append(array)
+            offset += array.nbytes + _padding(array.nbytes)
+        null_mask_offset = offset
+        arrays.append(np.ascontiguousarray(batch.null_mask))
+        offset += batch.null_mask.nbytes + _padding(batch.null_mask.nbytes)
+
+        header = json.dumps({
+            "rows": len(batch), "columns": columns,
+            "null_mask": null_mask_offset, "nbytes": offset,
+        }).encode()
+
+        file = self._file
+        file.write(_LENGTH.pack(len(header)))
+        file.write(header)
+        file.write(b"\0" * _padding(file.tell()))
+        for array in arrays:
+            file.write(array.data)
+            file.write(b"\0" * _padding(array.nbytes))
+        self.rows += len(batch)
@@ -0,0 +1,359 @@
+"""
+http_source.py
+--------------
+Async HTTP sources with pooled keep-alive connections.
+
+Built on asyncio streams only (no third-party HTTP client):
+
+- ConnectionPool: reuses HTTP/1.1 keep-alive connections per host,
+  with a global and a per-host limit on open connections
+- HttpClient:     GET requests over the pool (Content-Length and
+                  chunked bodies, per-request timeout, stale pooled
+                  connections retried once on a fresh one)
+- HttpSource:     a paginated JSON endpoint; pages are streamed as
+                  they arrive (async iteration) or collected by
+                  fetch() for the SourceRegistry
+
+Pagination follows a "next" URL in the JSON body or a
+Link: <...>; rel="next" header.
+
+Author: Anupam Bhattacharyya
+"""
+
+import asyncio
+import re
+import ssl
+import time
+from collections import deque
+from urllib.parse import urljoin, urlsplit
+
+from decorators import logger, retry
+from serialization import loads
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+_LINK_NEXT = re.compile(r'<([^>]+)>\s*;\s*rel="?next"?')
+
+
+class HttpError(Exception):
+    """
+    Non-2xx response.
+    """
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+class RetryableHttpError(HttpError, ConnectionError):
+    """
+    5xx / 429 response: worth retrying (a ConnectionError, so the
+    default retry_on of the fetchers covers it).
+    """
+
+
+class Response:
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers  # lower-cased names
+        self.body = body
+
+    def json(self):
+        return loads(self.body)
+
+
+# ============================================================
+# CONNECTION POOL
+# ============================================================
+
+class _Connection:
+
+    __slots__ = ("key", "reader", "writer", "idle_since")
+
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = None
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Keep-alive connections keyed by (scheme, host, port).
+
+    max_connections: open connections in use, across all hosts
+    max_per_host:    open connections in use per host
+    idle_timeout:    seconds an idle connection may be reused
+    """
+
+    def __init__(self, max_connections=100, max_per_host=10, idle_timeout=30.0,
+                 ssl_context=None):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context
+        self.opened = 0  # connections created (reuse = requests - opened)
+        self._loop = None
+        self._reset()
+
+    def _reset(self):
+        self._idle = {}
+        self._host_limits = {}
+        self._limit = asyncio.Semaphore(self.max_connections)
+
+    def _check_loop(self):
+        # Connections and semaphores belong to one event loop; a new
+        # asyncio.run() starts from an empty pool
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._reset()
+
+    async def acquire(self, scheme, host, port):
+        """
+        Return (connection, reused) once a slot is free.
+        """
+        self._check_loop()
+        key = (scheme, host, port)
+        host_limit = self._host_limits.setdefault(key, asyncio.Semaphore(self.max_per_host))
+        await self._limit.acquire()
+        await host_limit.acquire()
+
+        try:
+            idle = self._idle.get(key)
+            while idle:
+                connection = idle.pop()
+                fresh = time.monotonic() - connection.idle_since < self.idle_timeout
+                if fresh and not connection.reader.at_eof():
+                    return connection, True
+                connection.close()
+
+            ssl_context = None
+            if scheme == "https":
+                ssl_context = self.ssl_context or ssl.create_default_context()
+            reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+            self.opened += 1
+            return _Connection(key, reader, writer), False
+        except BaseException:
+            host_limit.release()
+            self._limit.release()
+            raise
+
+    def release(self, connection, reusable):
+        if reusable:
+            connection.idle_since = time.monotonic()
+            idle = self._idle.setdefault(connection.key, deque())
+            idle.append(connection)
+            while len(idle) > self.max_per_host:
+                idle.popleft().close()
+        else:
+            connection.close()
+        self._host_limits[connection.key].release()
+        self._limit.release()
+
+    def close(self):
+        for idle in self._idle.values():
+            while idle:
+                idle.pop().close()
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+async def _read_body(reader, status, headers):
+    """
+    Return (body, reusable_framing).
+    """
+    if status in (204, 304) or 100 <= status < 200:
+        return b"", True  # never has a body, whatever the headers say
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        parts = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                return b"".join(parts), True
+            parts.append(await reader.readexactly(size))
+            await reader.readexactly(2)  # CRLF after each chunk
+
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"])), True
+    return await reader.read(), False  # body ends when the server closes
+
+
+class HttpClient:
+    """
+    Pooled async HTTP/1.1 client (GET only, JSON APIs).
+
+    Use one client for many requests so connections are reused;
+    close it (or use `async with`) when done.
+    """
+
+    def __init__(self, pool=None, timeout=10.0, headers=None):
+        self.pool = pool or ConnectionPool()
+        self.timeout = timeout
+        self.headers = {"Accept": "application/json", **(headers or {})}
+
+    async def get(self, url, headers=None):
+        """
+        GET url and return a Response; non-2xx raises HttpError.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in DEFAULT_PORTS:
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        host, port = parts.hostname, parts.port or DEFAULT_PORTS[parts.scheme]
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        request = "".join(
+            f"{name}: {value}\r\n"
+            for name, value in {
+                "Host": parts.netloc, "Connection": "keep-alive",
+                **self.headers, **(headers or {})
+            }.items()
+        )
+        request = f"GET {target} HTTP/1.1\r\n{request}\r\n".encode("latin-1")
+
+        for attempt in range(2):
+            connection, reused = await self.pool.acquire(parts.scheme, host, port)
+            reusable = False
+            try:
+                response, reusable = await asyncio.wait_for(
+                    self._exchange(connection, request), self.timeout
+                )
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server may close an idle keep-alive connection
+                # just as we reuse it: retry once on a new one
+                if not reused or attempt:
+                    raise
+                logger.info("[HTTP] Stale pooled connection to %s, reconnecting", host)
+            finally:
+                self.pool.release(connection, reusable)
+
+        if response.status == 429 or response.status >= 500:
+            raise RetryableHttpError(response.status, url)
+        if not 200 <= response.status < 300:
+            raise HttpError(response.status, url)
+        return response
+
+    @staticmethod
+    async def _exchange(connection, request):
+        connection.writer.write(request)
+        await connection.writer.drain()
+
+        status_line = await connection.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        status = int(status)
+
+        headers = {}
+        while (line := await connection.reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        body, framed = await _read_body(connection.reader, status, headers)
+        keep_alive = (
+            headers.get("connection", "").lower() != "close"
+            if version == "HTTP/1.1"
+            else headers.get("connection", "").lower() == "keep-alive"
+        )
+        return Response(status, headers, body), framed and keep_alive
+
+    def close(self):
+        self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+# ============================================================
+# PAGINATED SOURCE
+# ============================================================
+
+class HttpSource:
+    """
+    Paginated JSON endpoint.
+
+    url:         first page
+    records_key: key of the record list in each page (None if the
+                 page body is the list itself)
+    next_key:    key of the next page URL in the body; the Link
+                 header (rel="next") is used if it is missing
+    max_pages:   stop after this many pages (None = until no next)
+    bucket:      optional rate limiter (e.g. ingestion.TokenBucket);
+                 acquired before every page request, retries included
+
+    `async for records in source` yields each page as it arrives,
+    so it can feed Pipeline.arun directly; fetch() returns all
+    records (the SourceRegistry fetcher protocol).
+    """
+
+    def __init__(self, url, client=None, records_key="records", next_key="next",
+                 max_pages=None, bucket=None):
+        self.url = url
+        self.client = client or HttpClient()
+        self.records_key = records_key
+        self.next_key = next_key
+        self.max_pages = max_pages
+        self.bucket = bucket
+
+    @retry(max_attempts=3, retry_on=(ConnectionError, asyncio.TimeoutError))
+    async def _get_page(self, url):
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        return await self.client.get(url)
+
+    def _next_url(self, url, response, payload):
+        next_url = payload.get(self.next_key) if isinstance(payload, dict) else None
+        if not next_url:
+            match = _LINK_NEXT.search(response.headers.get("link", ""))
+            next_url = match.group(1) if match else None
+        return urljoin(url, next_url) if next_url else None
+
+    async def pages(self):
+        url, count = self.url, 0
+        while url and (self.max_pages is None or count < self.max_pages):
+            response = await self._get_page(url)
+            payload = response.json()
+            yield payload[self.records_key] if self.records_key else payload
+            url, count = self._next_url(url, response, payload), count + 1
+
+    def __aiter__(self):
+        return self.pages()
+
+    async def fetch(self):
+        return [item async for page in self.pages() for item in page]
+
+    def __repr__(self):
+        return f"HttpSource({self.url!r})"
+
+
+def register_http_source(registry, name, url, client=None, **limits):
+    """
+    Register an HttpSource's fetch() under name (limits as for
+    SourceRegistry.register: rate_limit, burst, timeout).
+
+    rate_limit / burst apply to every page request, not only to
+    the start of fetch().
+    """
+    source = HttpSource(url, client)
+    registry.register(name, source.fetch, **limits)
+    # Move the source's token bucket from the scheduler (one token
+    # per fetch) to the page requests
+    entry = registry.get(name)
+    source.bucket, entry.bucket = entry.bucket, None
+    return source
@@ -0,0 +1,246 @@
+"""
+incremental.py
+--------------
+Incremental pipeline for continuously arriving records.
+
+Instead of reprocessing the full dataset, IncrementalPipeline keeps
+running state for mergeable steps (see processors.py) and only
+processes each new delta:
+
+- Stateless steps (Cleaner, Transformer) run on the delta only
+- A global-state step (FeatureEngineer) merges the delta's partial
+  state into its running state; rows emitted earlier are
+  re-normalized lazily, only when the finalized state (global max)
+  has changed since they were computed
+- A trailing aggregate (MetricsCalculator) merges the delta's
+  partial state, so metrics are updated in O(delta), as long as
+  neither it nor a filter before it reads (directly or through
+  the steps in between) a field the global-state step writes
+
+Supported step shape:
+    stateless* [global-state step] stateless* [aggregate step]
+
+Processed rows are only kept when something may need them again:
+a pipeline that ends in an aggregate which does not depend on
+re-normalized fields keeps nothing but the running states, so
+memory stays constant however many deltas arrive. keep_rows=True
+keeps them anyway (for rows()).
+
+Author: Anupam Bhattacharyya
+"""
+
+from pipeline import (
+    call_step,
+    combine_chunks,
+    fuse_steps,
+    is_mergeable,
+    is_stateless,
+    needs_global_state,
+    step_name,
+    to_native,
+)
+
+
+def _fields(step, attribute):
+    return set(getattr(step, attribute, ()))
+
+
+def _declared_steps(steps):
+    """
+    Flatten composite steps (e.g. FusedStep); None if any step does
+    not declare kind / reads / writes.
+    """
+    flat = []
+    for step in steps:
+        if hasattr(step, "steps"):
+            children = _declared_steps(step.steps)
+            if children is None:
+                return None
+            flat += children
+        elif all(hasattr(step, name) for name in ("kind", "reads", "writes")):
+            flat.append(step)
+        else:
+            return None
+    return flat
+
+
+def depends_on_fields(steps, fields):
+    """
+    Fields whose values may depend on `fields` after `steps`, or
+    None if the rows kept by the steps may depend on them (a filter
+    reads one) or a step does not declare what it reads / writes.
+    """
+    declared = _declared_steps(steps)
+    if declared is None:
+        return None
+
+    tainted = set(fields)
+    for step in declared:
+        reads_tainted = not _fields(step, "reads").isdisjoint(tainted)
+        if step.kind == "filter" and reads_tainted:
+            return None
+        if reads_tainted:
+            tainted |= _fields(step, "writes")
+        else:
+            tainted -= _fields(step, "writes")  # overwritten independently
+    return tainted
+
+
+class _EmittedChunk:
+    """
+    Rows before and after the global-state step, plus the state
+    they were computed with.
+    """
+
+    __slots__ = ("source", "output", "stats")
+
+    def __init__(self, source, output, stats):
+        self.source = source
+        self.output = output
+        self.stats = stats
+
+
+class IncrementalPipeline:
+    """
+    Keeps running state so each update() costs O(delta).
+    """
+
+    def __init__(self, steps, columnar=False, fuse=True, keep_rows=None):
+        """
+        keep_rows: keep processed rows for rows() / re-normalization.
+                   None (default) keeps them unless the pipeline ends
+                   in an aggregate that is merged per delta; False
+                   is refused if the aggregate must be recomputed
+                   from the rows.
+        """
+        self.steps = fuse_steps(steps) if fuse else list(steps)
+        self.columnar = columnar
+        self._split(self.steps)
+
+        needs_rows = self.aggregate is not None and not self.aggregate_is_stable
+        if keep_rows is None:
+            keep_rows = not self.aggregate_is_stable
+        elif not keep_rows and needs_rows:
+            raise ValueError(
+                f"{step_name(self.aggregate)} is recomputed from re-normalized rows; "
+                "IncrementalPipeline needs keep_rows=True"
+            )
+        self.keep_rows = keep_rows
+
+        self.global_state = None
+        self.aggregate_state = None
+        self.chunks = []
+
+    def _split(self, steps):
+        self.before, self.global_step, self.after, self.aggregate = [], None, [], None
+        target = self.before
+
+        for index, step in enumerate(steps):
+            if is_stateless(step):
+                target.append(step)
+            elif is_mergeable(step) and needs_global_state(step) and self.global_step is None:
+                self.global_step, target = step, self.after
+            elif is_mergeable(step) and index == len(steps) - 1:
+                self.aggregate = step
+            else:
+                raise ValueError(
+                    f"IncrementalPipeline cannot maintain {step_name(step)} incrementally; "
+                    "supported shape: stateless* [global-state] stateless* [aggregate]"
+                )
+
+        # The aggregate can be merged per delta if it sees the same
+        # rows and fields whatever the global state is: follow the
+        # fields the global step writes through the steps in between
+        self.aggregate_is_stable = self.aggregate is not None
+        if self.aggregate_is_stable and self.global_step is not None:
+            tainted = depends_on_fields(self.after, _fields(self.global_step, "writes"))
+            self.aggregate_is_stable = (
+                tainted is not None and _fields(self.aggregate, "reads").isdisjoint(tainted)
+            )
+
+    # --------------------------------------------------------
+    # Updates
+    # --------------------------------------------------------
+
+    def update(self, delta):
+        """
+        Process newly arrived records.
+
+        Returns the updated aggregate if the pipeline ends in one,
+        else the delta's own output rows. With keep_rows, source
+        rows of every delta are kept (after the stateless steps) so
+        earlier output can be re-normalized later by rows().
+        """
+        data = to_native(delta, self.columnar)
+        for step in self.before:
+            data = call_step(step, "run", data)
+
+        if self.global_step is not None:
+            partial = call_step(self.global_step, "partial", data)
+            self.global_state = (
+                partial if self.global_state is None
+                else self.global_step.merge(self.global_state, partial)
+            )
+            chunk = _EmittedChunk(data, None, None)
+        else:
+            chunk = _EmittedChunk(data, data, None)
+        if self.keep_rows:
+            self.chunks.append(chunk)
+
+        if self.aggregate_is_stable:
+            # The steps in between do not depend on the global state,
+            # so the delta goes through them without re-normalizing
+            rows = data
+            for step in self.after:
+                rows = call_step(step, "run", rows)
+            partial = call_step(self.aggregate, "partial", rows)
+            self.aggregate_state = (
+                partial if self.aggregate_state is None
+                else self.aggregate.merge(self.aggregate_state, partial)
+            )
+
+        if self.aggregate is not None:
+            return self.result()
+        return self._emit(chunk)
+
+    def _current_stats(self):
+        return self.global_step.finalize(self.global_state)
+
+    def _emit(self, chunk):
+        """
+        (Re)compute a chunk's output if the global state changed.
+        """
+        if self.global_step is None:
+            return chunk.output
+
+        stats = self._current_stats()
+        if chunk.output is None or chunk.stats != stats:
+            data = call_step(self.global_step, "apply", chunk.source, stats)
+            for step in self.after:
+                data = call_step(step, "run", data)
+            chunk.output, chunk.stats = data, stats
+        return chunk.output
+
+    # --------------------------------------------------------
+    # Reading results
+    # --------------------------------------------------------
+
+    def rows(self):
+        """
+        All processed rows so far, re-normalized where stale.
+        """
+        if not self.keep_rows:
+            raise ValueError("rows() needs IncrementalPipeline(..., keep_rows=True)")
+        return combine_chunks([self._emit(chunk) for chunk in self.chunks])
+
+    def result(self):
+        """
+        Current aggregate if the pipeline ends in one, else rows().
+        """
+        if self.aggregate is None:
+            return self.rows()
+
+        if not self.aggregate_is_stable:
+            # Depends on re-normalized fields: recompute from rows
+            return call_step(self.aggregate, "run", self.rows())
+        return self.aggregate.finalize(self.aggregate_state)
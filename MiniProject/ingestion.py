@@ -6,19 +6,230 @@ Async data ingestion layer.
 Simulates fetching data from multiple external APIs.
 Uses async/await to run requests concurrently.
 
+Sources are registered in a SourceRegistry and fetched by an
+IngestionScheduler that bounds concurrency, rate-limits each
+source and cancels stragglers. ingest_stream() yields each
+source's records as soon as they arrive.
+
+Real HTTP APIs are read by the pooled, paginated HttpSource in
+http_source.py (set PIPELINE_HTTP_SOURCE_URL to register one here).
+
+Large local extracts are read by the memory-mapped file sources in
+file_io.py instead, which stream chunks into Pipeline.run / arun.
+
 Author: Anupam Bhattacharyya
 """
 
 import asyncio
-from decorators import log_execution, timing
+import os
+import time
+from collections import namedtuple
+from contextlib import aclosing
+
+from decorators import CircuitBreaker, log_execution, logger, retry, timing
+from http_source import register_http_source
+
+
+# ============================================================
+# RATE LIMITING
+# ============================================================
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, up to `burst`.
+
+    acquire() waits until a token is available, so callers are
+    spread out instead of hitting the upstream all at once.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+# ============================================================
+# SOURCE REGISTRY
+# ============================================================
+
+class Source:
+    """
+    A named async fetcher plus its ingestion limits.
+
+    fetch:      async callable returning a list of records
+    rate_limit: max fetches per second (None = unlimited)
+    burst:      fetches allowed back-to-back before limiting
+    timeout:    seconds before a single fetch is cancelled
+    """
+
+    def __init__(self, name, fetch, rate_limit=None, burst=1, timeout=None):
+        self.name = name
+        self.fetch = fetch
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+
+    def __repr__(self):
+        return f"Source({self.name!r})"
+
+
+class SourceRegistry:
+    """
+    Keeps sources in registration order.
+    """
+
+    def __init__(self):
+        self._sources = {}
+
+    def register(self, name, fetch=None, **limits):
+        """
+        Register a fetcher; usable directly or as a decorator:
+
+            @registry.register("source_a", timeout=5)
+            async def fetch_source_a(): ...
+        """
+        if fetch is None:
+            def decorator(func):
+                self.register(name, func, **limits)
+                return func
+            return decorator
+
+        if name in self._sources:
+            raise ValueError(f"Source already registered: {name}")
+        self._sources[name] = Source(name, fetch, **limits)
+        return fetch
+
+    def unregister(self, name):
+        self._sources.pop(name, None)
+
+    def get(self, name):
+        return self._sources[name]
+
+    def names(self):
+        return list(self._sources)
+
+    def __iter__(self):
+        return iter(self._sources.values())
+
+    def __len__(self):
+        return len(self._sources)
+
+
+SOURCES = SourceRegistry()
+
+
+# ============================================================
+# INGESTION SCHEDULER
+# ============================================================
+
+SourceResult = namedtuple("SourceResult", ["name", "records", "error", "elapsed"])
+
+
+class IngestionScheduler:
+    """
+    Fetches many sources with bounded concurrency.
+
+    - max_concurrency: global cap on in-flight fetches (semaphore)
+    - per-source token buckets and timeouts (see Source)
+    - deadline: seconds for the whole run; unfinished fetches
+      are cancelled and reported as failed
+    """
+
+    def __init__(self, registry=SOURCES, max_concurrency=10, deadline=None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.registry = registry
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+
+    async def _fetch(self, source, semaphore):
+        start = time.perf_counter()
+        try:
+            if source.bucket is not None:
+                await source.bucket.acquire()
+            async with semaphore:
+                records = await asyncio.wait_for(source.fetch(), source.timeout)
+            return SourceResult(source.name, records, None, time.perf_counter() - start)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[INGEST] Source %s failed: %r", source.name, exc)
+            return SourceResult(source.name, [], exc, time.perf_counter() - start)
+
+    async def stream(self, names=None):
+        """
+        Yield one SourceResult per source as soon as it finishes
+        (fastest first), so consumers can start before the slowest
+        source has answered.
+        """
+        sources = [self.registry.get(name) for name in (names or self.registry.names())]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = {
+            source.name: asyncio.create_task(self._fetch(source, semaphore))
+            for source in sources
+        }
+
+        finished = set()
+        try:
+            for next_done in asyncio.as_completed(tasks.values(), timeout=self.deadline):
+                result = await next_done
+                finished.add(result.name)
+                yield result
+        except asyncio.TimeoutError:
+            for name in tasks:
+                if name not in finished:
+                    logger.warning("[INGEST] Source %s cancelled at deadline", name)
+                    yield SourceResult(name, [], asyncio.TimeoutError(), self.deadline)
+        finally:
+            # Also runs if the consumer stops early: no orphan fetches
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run(self, names=None):
+        """
+        Fetch the given sources (default: all) and return one
+        SourceResult per source, in registry order.
+        """
+        by_name = {result.name: result async for result in self.stream(names)}
+        return [by_name[name] for name in (names or self.registry.names())]
 
 
 # ============================================================
 # SIMULATED ASYNC DATA SOURCES
 # ============================================================
 
+# Fetchers are not cached: every ingestion sees fresh upstream data
+# and gets its own record lists. A caller that can tolerate stale,
+# shared results may opt in with cache.cached(ttl=...) (see Readme).
+
+@SOURCES.register("source_a", timeout=5)
 @log_execution
 @timing
+@retry(
+    max_attempts=3,
+    retry_on=(ConnectionError, asyncio.TimeoutError),
+    deadline=4,
+    breaker=CircuitBreaker("source_a")
+)
 async def fetch_source_a():
     """
     Simulates API call to Source A
@@ -30,8 +241,15 @@ async def fetch_source_a():
     ]
 
 
+@SOURCES.register("source_b", timeout=5)
 @log_execution
 @timing
+@retry(
+    max_attempts=3,
+    retry_on=(ConnectionError, asyncio.TimeoutError),
+    deadline=4,
+    breaker=CircuitBreaker("source_b")
+)
 async def fetch_source_b():
     """
     Simulates API call to Source B
@@ -43,22 +261,59 @@ async def fetch_source_b():
     ]
 
 
+# Real paginated JSON API, e.g. http://localhost:8080/records
+if os.environ.get("PIPELINE_HTTP_SOURCE_URL"):
+    register_http_source(
+        SOURCES, "source_http", os.environ["PIPELINE_HTTP_SOURCE_URL"], timeout=30
+    )
+
+
 # ============================================================
 # INGESTION ORCHESTRATOR
 # ============================================================
 
 @log_execution
 @timing
-async def ingest_all_sources():
+async def ingest_all_sources(scheduler=None, dedup=None):
     """
-    Fetch data from all sources concurrently.
+    Fetch data from all registered sources concurrently.
+
+    dedup: optional dedup.Deduplicator; overlapping ids are merged
+    (later sources in registry order count as "latest").
     """
-    data_sets = await asyncio.gather(
-        fetch_source_a(),
-        fetch_source_b()
-    )
+    scheduler = scheduler or IngestionScheduler()
+    data_sets = [result.records for result in await scheduler.run()]
 
     # Flatten list of lists (comprehension)
     combined_data = [item for dataset in data_sets for item in dataset]
 
+    if dedup is not None:
+        combined_data = dedup.run(combined_data)
     return combined_data
+
+
+@log_execution
+@timing
+async def ingest_stream(scheduler=None, dedup=None):
+    """
+    Async iterator of record batches, one per source, yielded as
+    soon as each source lands (see Pipeline.arun).
+
+    dedup: optional dedup.Deduplicator. With resolve="first" each
+    batch is yielded without the ids seen in earlier batches; other
+    policies may still change a record later, so all records are
+    yielded as one merged batch once every source has landed.
+    """
+    scheduler = scheduler or IngestionScheduler()
+    streaming = dedup is None or dedup.resolve == "first"
+    if dedup is not None:
+        dedup.reset()
+
+    async with aclosing(scheduler.stream()) as results:
+        async for result in results:
+            records = result.records if dedup is None else dedup.add(result.records)
+            if records and streaming:
+                yield records
+
+    if not streaming and dedup.index:
+        yield dedup.records()
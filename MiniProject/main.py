@@ -12,41 +12,37 @@ Author: Anupam Bhattacharyya
 """
 
 import asyncio
+import logging
+import os
+import sys
 
-from ingestion import ingest_all_sources
-from processors import (
-    Cleaner,
-    Transformer,
-    FeatureEngineer,
-    MetricsCalculator
-)
+from ingestion import ingest_stream
 from pipeline import Pipeline
+from metrics import REGISTRY
+from serialization import dumps
 
 
-async def main():
-    print("\n========== DATA INGESTION ==========\n")
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline.json")
 
-    # 1️⃣ Ingest raw data asynchronously
-    raw_data = await ingest_all_sources()
-    print("Raw Data:")
-    print(raw_data)
 
-    print("\n========== PIPELINE EXECUTION ==========\n")
+async def main(config_path=DEFAULT_CONFIG):
+    print("\n========== STREAMING INGESTION + PIPELINE ==========\n")
 
-    # 2️⃣ Configure pipeline using composition
-    pipeline = Pipeline(steps=[
-        Cleaner(),
-        Transformer(multiplier=2),
-        FeatureEngineer(),
-        MetricsCalculator()
-    ])
+    # 1️⃣ Configure pipeline using composition (steps come from the
+    #    config file; their modules are imported only now)
+    pipeline = Pipeline.from_config(config_path)
 
-    # 3️⃣ Run pipeline
-    result = pipeline.run(raw_data)
+    # 2️⃣ Ingest asynchronously; each source's records enter the
+    #    pipeline as soon as they land (no waiting for the slowest)
+    result = await pipeline.arun(ingest_stream())
 
     print("\n========== FINAL OUTPUT ==========\n")
-    print(result)
+    print(dumps(result, indent=True).decode())
+
+    print("\n========== METRICS ==========\n")
+    print(REGISTRY.to_json(indent=2))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main(*sys.argv[1:2]))
@@ -0,0 +1,213 @@
+"""
+metrics.py
+----------
+In-process metrics registry fed by the decorators and the pipeline.
+
+Collects:
+- Call counts per function
+- Latency histograms (perf_counter_ns) with p50 / p95 / p99
+- Records in / records out per pipeline step
+
+Exports to JSON or Prometheus text format.
+
+Instrumentation is controlled by one global switch:
+- PIPELINE_METRICS=0 in the environment disables it at import time,
+  so decorators return the undecorated function (zero overhead)
+- enable() / disable() toggle it at runtime; wrappers then take
+  a single-branch fast path
+
+Author: Anupam Bhattacharyya
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_left
+
+
+# ============================================================
+# GLOBAL SWITCH
+# ============================================================
+
+_enabled = os.environ.get("PIPELINE_METRICS", "1").lower() not in ("0", "false", "off")
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+# ============================================================
+# LATENCY HISTOGRAM
+# ============================================================
+
+# Bucket upper bounds in ns: 1µs .. ~134s, factor sqrt(2) apart
+BUCKET_BOUNDS_NS = [int(1_000 * 2 ** (i / 2)) for i in range(55)]
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Percentiles are interpolated inside the matching bucket, so
+    they are accurate to within one bucket width (~41%).
+    """
+
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)  # last = +Inf
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = None
+
+    def observe(self, elapsed_ns):
+        self.counts[bisect_left(BUCKET_BOUNDS_NS, elapsed_ns)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if self.max_ns is None or elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, q):
+        """
+        Estimated q-th percentile (0 < q <= 100) in ns.
+        """
+        if not self.count:
+            return None
+
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKET_BOUNDS_NS[index - 1] if index else 0
+                upper = BUCKET_BOUNDS_NS[index] if index < len(BUCKET_BOUNDS_NS) else self.max_ns
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min_ns), self.max_ns)
+            seen += bucket_count
+        return self.max_ns
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum_ns": self.total_ns,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "p50_ns": self.percentile(50),
+            "p95_ns": self.percentile(95),
+            "p99_ns": self.percentile(99),
+        }
+
+
+# ============================================================
+# REGISTRY
+# ============================================================
+
+class MetricsRegistry:
+    """
+    Thread-safe store for call, latency and step metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}
+            self.latency = {}
+            self.steps = {}
+
+    # --------------------------------------------------------
+    # Recording
+    # --------------------------------------------------------
+
+    def count_call(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def observe_latency(self, name, elapsed_ns):
+        with self._lock:
+            histogram = self.latency.get(name)
+            if histogram is None:
+                histogram = self.latency[name] = Histogram()
+            histogram.observe(elapsed_ns)
+
+    def observe_step(self, name, records_in, records_out):
+        with self._lock:
+            stats = self.steps.setdefault(
+                name, {"runs": 0, "records_in": 0, "records_out": 0}
+            )
+            stats["runs"] += 1
+            stats["records_in"] += records_in
+            stats["records_out"] += records_out
+
+    # --------------------------------------------------------
+    # Export
+    # --------------------------------------------------------
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "latency": {name: h.summary() for name, h in self.latency.items()},
+                "steps": {name: dict(stats) for name, stats in self.steps.items()},
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix="pipeline"):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            lines.append(f"# TYPE {prefix}_calls_total counter")
+            for name, count in self.calls.items():
+                lines.append(f'{prefix}_calls_total{{function="{name}"}} {count}')
+
+            lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+            for name, histogram in self.latency.items():
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKET_BOUNDS_NS, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{prefix}_latency_seconds_bucket{{function="{name}",'
+                        f'le="{bound / 1e9:g}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{prefix}_latency_seconds_bucket{{function="{name}",le="+Inf"}} '
+                    f'{histogram.count}'
+                )
+                lines.append(
+                    f'{prefix}_latency_seconds_sum{{function="{name}"}} '
+                    f'{histogram.total_ns / 1e9:g}'
+                )
+                lines.append(
+                    f'{prefix}_latency_seconds_count{{function="{name}"}} {histogram.count}'
+                )
+
+            for field in ("records_in", "records_out"):
+                lines.append(f"# TYPE {prefix}_step_{field}_total counter")
+                for name, stats in self.steps.items():
+                    lines.append(
+                        f'{prefix}_step_{field}_total{{step="{name}"}} {stats[field]}'
+                    )
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide default registry
+REGISTRY = MetricsRegistry()
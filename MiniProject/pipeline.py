@@ -7,38 +7,906 @@ The pipeline:
 - Accepts processing steps
 - Executes them sequentially
 - Is independent of step implementation
+- Can run in columnar mode on a RecordBatch (see records.py)
+- Can stream fixed-size chunks through the steps (bounded memory)
+- Can shard the data across a pluggable executor (see executors.py)
+- Reorders filters ahead of maps and drops unused maps (see planner.py)
+- Fuses consecutive filter/map steps into a single pass
+- Runs steps as a DAG with shared upstream outputs (DagPipeline)
+- Calls optional per-step hooks (see profiling.py)
+- Spills intermediate results to disk over a memory budget (see spill.py)
+- Can be built from a JSON / TOML / YAML config (see config.py)
 
 Author: Anupam Bhattacharyya
 """
 
-from decorators import log_execution, timing
+import asyncio
+from itertools import islice
 
+import metrics
+from config import load_config, pipeline_options
+from decorators import log_execution, logger, timing
+from records import RecordBatch
+from spill import SpillBuffer, estimate_nbytes
+from step_cache import chain_key, fingerprint_data
+
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+# ============================================================
+# CHUNKING HELPERS
+# ============================================================
+
+def iter_chunks(data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Split data into chunks of at most chunk_size records.
+
+    Lists and RecordBatches are sliced; sources that chunk
+    themselves (iter_chunks(chunk_size), e.g. file_io.CsvSource)
+    are delegated to; any other iterable (generator, ...) is
+    consumed lazily.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    if hasattr(data, "iter_chunks"):
+        yield from data.iter_chunks(chunk_size)
+        return
+
+    if isinstance(data, RecordBatch):
+        for start in range(0, len(data), chunk_size):
+            yield data.slice(start, start + chunk_size)
+        return
+
+    if isinstance(data, list):
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+        return
+
+    iterator = iter(data)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def aiter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Async version of iter_chunks() for an async iterable of records.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    chunk = []
+    async for item in source:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def combine_chunks(chunks):
+    """
+    Join streamed output back into a single result.
+
+    Record chunks are concatenated; a step that returns a
+    non-record result (e.g. metrics dict) is returned as-is.
+    """
+    chunks = list(chunks)
+    if len(chunks) == 1 and not isinstance(chunks[0], (list, RecordBatch)):
+        return chunks[0]
+    if chunks and isinstance(chunks[0], RecordBatch):
+        return RecordBatch.concat(chunks)
+    return [item for chunk in chunks for item in chunk]
+
+
+def buffer_source(source, buffer=list):
+    """
+    Make a one-shot chunk source replayable by keeping its chunks.
+
+    The upstream is only consumed on the first call. buffer is a
+    factory for the chunk store (e.g. a spill.SpillBuffer).
+    """
+    buffered = None
+
+    def replay():
+        nonlocal buffered
+        if buffered is None:
+            buffered = buffer()
+            for chunk in source():
+                buffered.append(chunk)
+        return iter(buffered)
+    return replay
+
+
+# ============================================================
+# STEP PROTOCOL
+# ============================================================
+
+def step_name(step):
+    return getattr(step, "name", step.__class__.__name__)
+
+
+def is_fusible(step):
+    """
+    A step is fusible if it declares itself a per-record filter
+    (keep(item) -> bool) or map (map_record(item) -> item).
+
+    Maps that need global state (e.g. FeatureEngineer) cannot be
+    evaluated one record at a time.
+    """
+    return getattr(step, "kind", None) in ("filter", "map") and not needs_global_state(step)
+
+
+def record_count(data):
+    return len(data) if isinstance(data, (list, RecordBatch)) else 1
+
+
+def observe_step(step, data_in, data_out):
+    """
+    Report records in / out of one step run to the metrics registry.
+    """
+    if metrics.is_enabled():
+        metrics.REGISTRY.observe_step(
+            step_name(step), record_count(data_in), record_count(data_out)
+        )
+
+
+def to_native(data, columnar):
+    """
+    Convert list-of-dict input at the boundary in columnar mode.
+    """
+    if columnar and not isinstance(data, RecordBatch):
+        return RecordBatch.from_records(data)
+    return data
+
+
+def call_step(step, method, data, *args):
+    """
+    Call step.<method>, dispatching to <method>_batch for batches.
+    """
+    if isinstance(data, RecordBatch):
+        method = f"{method}_batch"
+        if not hasattr(step, method):
+            raise TypeError(
+                f"{step_name(step)} does not support RecordBatch input"
+            )
+    return getattr(step, method)(data, *args)
+
+
+def is_stateless(step):
+    """
+    A step is stateless if it declares it can process any chunk
+    independently of the rest of the data.
+    """
+    return getattr(step, "stateless", False)
+
+
+def is_mergeable(step):
+    """
+    A step is mergeable if it can summarize chunks independently:
+
+    partial(chunk) -> state
+    merge(state, state) -> state
+    finalize(state) -> result
+    """
+    return all(hasattr(step, name) for name in ("partial", "merge", "finalize"))
+
+
+def needs_global_state(step):
+    """
+    Mergeable steps that declare needs_global_state = True use the
+    finalized state in a second pass: apply(chunk, finalized_state).
+    """
+    return getattr(step, "needs_global_state", False)
+
+
+def run_shard(task):
+    """
+    Worker entry point for sharded execution (must be picklable).
+
+    task = (shard, columnar, head, stats, steps, partial_step, keep_output)
+
+    - head:         global-state step whose apply(shard, stats) runs first
+    - steps:        stateless steps run on the shard
+    - partial_step: mergeable step whose partial state is returned
+    """
+    shard, columnar, head, stats, steps, partial_step, keep_output = task
+
+    shard = to_native(shard, columnar)
+    if head is not None:
+        shard = call_step(head, "apply", shard, stats)
+    for step in steps:
+        shard = call_step(step, "run", shard)
+
+    state = call_step(partial_step, "partial", shard) if partial_step else None
+    return (shard if keep_output else None), state
+
+
+def run_node(task):
+    """
+    Worker entry point for one DAG node (must be picklable).
+
+    task = (step, inputs); extra inputs are passed as extra
+    positional arguments to step.run / run_batch.
+    """
+    step, inputs = task
+    result = call_step(step, "run", *inputs)
+    observe_step(step, inputs[0], result)
+    return result
+
+
+# ============================================================
+# STEP FUSION
+# ============================================================
+
+class FusedStep:
+    """
+    Several consecutive filter/map steps executed in one loop.
+
+    Each record goes through every filter and map in order before
+    the next record is read, so there is a single traversal and a
+    single output list instead of one intermediate list per step.
+
+    With in_place=True, maps after the first copying map mutate
+    the fresh copies instead of copying again.
+    """
+
+    stateless = True
+
+    def __init__(self, steps, in_place=False):
+        self.steps = list(steps)
+        self.in_place = in_place
+        self.name = "+".join(step_name(step) for step in self.steps)
+        self.copies_records = any(getattr(step, "copies_records", False) for step in self.steps)
+
+    @log_execution
+    def run(self, data):
+        return self._chain(data, owned=False)
+
+    @log_execution
+    def run_in_place(self, data):
+        return self._chain(data, owned=True)
+
+    def _chain(self, data, owned):
+        # Lazily chain filter()/map() so each record flows through
+        # every step before the next one is read
+        items = iter(data)
+        for step in self.steps:
+            if step.kind == "filter":
+                items = filter(step.keep, items)
+            elif owned and self.in_place and hasattr(step, "map_record_in_place"):
+                items = map(step.map_record_in_place, items)
+            else:
+                items = map(step.map_record, items)
+                owned = owned or getattr(step, "copies_records", False)
+        return list(items)
+
+    def run_batch(self, batch):
+        # Columnar steps are already vectorized: just chain them
+        for step in self.steps:
+            batch = step.run_batch(batch)
+        return batch
+
+
+def fuse_steps(steps, in_place=False):
+    """
+    Replace each run of 2+ consecutive fusible steps by a FusedStep.
+
+    Steps that do not declare a kind are left as they are.
+    """
+    fused, run = [], []
+    for step in list(steps) + [None]:
+        if step is not None and is_fusible(step):
+            run.append(step)
+            continue
+
+        if len(run) > 1:
+            fused.append(FusedStep(run, in_place))
+        else:
+            fused.extend(run)
+        run = []
+
+        if step is not None:
+            fused.append(step)
+    return fused
+
+
+# ============================================================
+# PIPELINE
+# ============================================================
 
 class Pipeline:
     """
     Orchestrates execution of processing steps.
     """
 
-    def __init__(self, steps):
+    def __init__(self, steps, columnar=False, executor=None, fuse=True, step_cache=None,
+                 in_place=False, hooks=None, optimize=True, memory_budget=None,
+                 spill_dir=None):
         """
-        steps: list of processor objects
+        steps:    list of processor objects
+        columnar: convert list-of-dict input to a RecordBatch once
+                  and use each step's vectorized run_batch()
+        executor: optional executor (see executors.py); run() then
+                  shards the data and runs stateless steps per shard
+        fuse:     run consecutive filter/map steps as one FusedStep
+        step_cache: optional StepCache (see step_cache.py); run()
+                  then reuses step outputs computed for the same
+                  input and step configuration
+        in_place: once an earlier step has copied the records, let
+                  later steps mutate those copies (run_in_place)
+                  instead of copying again; the caller's input is
+                  never mutated
+        hooks:    objects with before_step / after_step / on_error
+                  methods (see profiling.PipelineHook), called
+                  around every step run in this process
+        optimize: rewrite the step order from the steps' declared
+                  semantics before running (see planner.py, explain())
+        memory_budget: bytes of intermediate data to keep in memory;
+                  beyond it, results between steps are spilled to
+                  columnar checkpoint files and read back via mmap
+                  (see spill.py). None = never spill
+        spill_dir: directory for checkpoint files (default: temp dir)
         """
         self.steps = steps
+        self.columnar = columnar
+        self.executor = executor
+        self.fuse = fuse
+        self.step_cache = step_cache
+        self.in_place = in_place
+        self.hooks = list(hooks or [])
+        self.optimize = optimize
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a pipeline from a config file path or mapping.
+
+        Step modules are imported here, only for the steps listed.
+        """
+        if not isinstance(config, dict):
+            config = load_config(config)
+        return cls(**pipeline_options(config))
+
+    def logical_plan(self):
+        from planner import LogicalPlan  # planner imports this module's step helpers
+        return LogicalPlan(self.steps, optimize=self.optimize)
+
+    def plan(self):
+        """
+        Steps as they will actually be executed.
+        """
+        steps = self.logical_plan().steps
+        if self.fuse:
+            return fuse_steps(steps, self.in_place)
+        return steps
+
+    def explain(self):
+        """
+        Describe the logical plan, the optimizer's rewrites and the
+        physical (fused) steps, e.g. print(pipeline.explain()).
+        """
+        return self.logical_plan().explain(self.plan())
 
     @log_execution
     @timing
-    def run(self, data):
+    def run(self, data, as_records=False, chunk_size=None):
         """
         Run data through all pipeline steps.
+
+        In columnar mode the result stays a RecordBatch unless
+        as_records=True asks for a list of dicts.
+
+        With chunk_size set, the data is streamed through the
+        steps chunk by chunk (see stream()); file sources (see
+        file_io.py) are always streamed. With an executor, the data
+        is split into shards of chunk_size records instead.
         """
-        current_data = data
+        if chunk_size is None and hasattr(data, "iter_chunks"):
+            chunk_size = data.chunk_size
 
-        for step in self.steps:
-            step_name = step.__class__.__name__
-            print(f"[PIPELINE] Executing step: {step_name}")
+        if self.executor is not None:
+            current_data = self._run_sharded(data, chunk_size or DEFAULT_CHUNK_SIZE)
+        elif chunk_size is not None:
+            current_data = combine_chunks(self.stream(data, chunk_size))
+        elif self.step_cache is not None:
+            current_data = self._run_cached(self._to_native(data))
+        else:
+            current_data = self._to_native(data)
+            owned = False  # do we hold the only reference to the records?
+            steps = self.plan()
+
+            for index, step in enumerate(steps):
+                logger.info("[PIPELINE] Executing step: %s", step_name(step))
+
+                # call a semantic method instead of run
+                if self._can_mutate(step, current_data, owned):
+                    current_data = self._run_step(step, "run_in_place", current_data)
+                else:
+                    current_data = self._run_step(step, "run", current_data)
+                    owned = owned or getattr(step, "copies_records", False)
 
-            # call a semantic method instead of run
-            current_data = step.run(current_data)
+                rest = steps[index + 1:]
+                if rest and self._over_budget(current_data):
+                    # Checkpoint to disk, free the in-memory copy and
+                    # stream the remaining steps from the mapped file
+                    logger.info("[PIPELINE] Over memory budget after step: %s", step_name(step))
+                    spill = SpillBuffer(0, self.spill_dir, self.columnar)
+                    for chunk in iter_chunks(current_data, DEFAULT_CHUNK_SIZE):
+                        spill.append(chunk)
+                    current_data = None
+                    current_data = combine_chunks(
+                        self._stream_steps(rest, lambda: iter(spill), True, DEFAULT_CHUNK_SIZE)
+                    )
+                    spill.close()
+                    break
 
+        if as_records and isinstance(current_data, RecordBatch):
+            current_data = current_data.to_records()
         return current_data
 
+    def _run_cached(self, data, steps=None):
+        """
+        Resume from the last step whose output is cached, then run
+        and store the outputs of the remaining steps.
+        """
+        steps = self.plan() if steps is None else steps
+        keys, key = [], fingerprint_data(data)
+        for step in steps:
+            key = chain_key(key, step)
+            keys.append(key)
+
+        start, current_data = 0, data
+        for index in range(len(steps) - 1, -1, -1):
+            found, value = self.step_cache.get(keys[index])
+            if found:
+                logger.info("[PIPELINE] Cache hit up to step: %s", step_name(steps[index]))
+                start, current_data = index + 1, value
+                break
+
+        for step, key in zip(steps[start:], keys[start:]):
+            logger.info("[PIPELINE] Executing step: %s", step_name(step))
+            current_data = self._run_step(step, "run", current_data)
+            self.step_cache.put(key, current_data)
+        return current_data
+
+    # --------------------------------------------------------
+    # Streaming execution
+    # --------------------------------------------------------
+
+    def stream(self, data, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Lazily pull fixed-size chunks through the steps.
+
+        Yields one output chunk at a time, so memory stays bounded
+        by chunk_size for stateless steps. Mergeable steps are fed
+        chunk by chunk; if a step needs global state, an extra pass
+        over its input is scheduled (replayed from data when it is a
+        list / RecordBatch / file source, buffered when it is a
+        one-shot iterator).
+        """
+        def source():
+            return (self._to_native(chunk) for chunk in iter_chunks(data, chunk_size))
+
+        replayable = isinstance(data, (list, RecordBatch)) or hasattr(data, "iter_chunks")
+        return self._stream_steps(self.plan(), source, replayable, chunk_size)
+
+    def write(self, data, sink, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream data through the steps into a sink (see file_io.py)
+        chunk by chunk, then close the sink. Returns rows written.
+
+        The sink is aborted (no partial file) if a step fails.
+        """
+        with sink:
+            for chunk in self.stream(data, chunk_size):
+                if not isinstance(chunk, (list, RecordBatch)):
+                    raise TypeError(
+                        f"Pipeline output is not records ({type(chunk).__name__}); "
+                        "nothing to write"
+                    )
+                sink.write(chunk)
+        return sink.rows
+
+    async def astream(self, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Async version of stream() for an async iterable of records.
+
+        Stateless leading steps run on each chunk as soon as it
+        arrives; the remaining steps run once the source is done.
+        """
+        prefix, rest = self._split_stateless_prefix()
+        buffered = self._chunk_buffer()
+
+        async for chunk in aiter_chunks(source, chunk_size):
+            chunk = self._to_native(chunk)
+            for step in prefix:
+                chunk = self._run_step(step, "run", chunk)
+
+            if rest:
+                buffered.append(chunk)
+            else:
+                yield chunk
+
+        if rest:
+            outputs = self._stream_steps(rest, lambda: iter(buffered), True, chunk_size)
+            for output in outputs:
+                yield output
+
+    @log_execution
+    @timing
+    async def arun(self, batches, max_pending=4, as_records=False):
+        """
+        Run the pipeline on an async iterable of record batches
+        (e.g. ingestion.ingest_stream()), overlapping I/O and work.
+
+        Stateless leading steps process each batch in a worker
+        thread as soon as it arrives, so the event loop keeps
+        fetching meanwhile. At most max_pending batches are queued;
+        a full queue stops pulling from the source (backpressure).
+        The remaining steps run once the source is exhausted
+        (through the step cache, if one is configured).
+        """
+        prefix, rest = self._split_stateless_prefix()
+        queue = asyncio.Queue(maxsize=max_pending)
+        done = object()
+        loop = asyncio.get_running_loop()
+
+        async def produce():
+            items = batches.__aiter__()
+            try:
+                async for batch in items:
+                    await queue.put(batch)
+                # Only on normal exhaustion / a source error: once
+                # cancelled, a put on a full queue would never return
+                await queue.put(done)
+            except Exception:
+                await queue.put(done)  # wake the consumer; it re-raises
+                raise
+            finally:
+                # Close the source now (e.g. ingest_stream() cancels
+                # its pending fetches), not at event loop shutdown
+                if hasattr(items, "aclose"):
+                    await items.aclose()
+
+        producer = asyncio.create_task(produce())
+        outputs = self._chunk_buffer()
+        try:
+            while (batch := await queue.get()) is not done:
+                outputs.append(
+                    await loop.run_in_executor(None, self._run_steps, prefix, batch)
+                )
+            await producer  # re-raise ingestion errors
+        finally:
+            producer.cancel()
+            await asyncio.wait({producer})
+            if not producer.cancelled():
+                producer.exception()  # already re-raised, or superseded by a step error
+
+        if rest and self.step_cache is not None:
+            result = self._run_cached(combine_chunks(outputs), rest)
+        else:
+            if rest:
+                buffered = outputs
+                outputs = self._stream_steps(rest, lambda: iter(buffered), True, DEFAULT_CHUNK_SIZE)
+            result = combine_chunks(outputs)
+
+        if as_records and isinstance(result, RecordBatch):
+            result = result.to_records()
+        return result
+
+    def _run_steps(self, steps, data):
+        data = self._to_native(data)
+        for step in steps:
+            data = self._run_step(step, "run", data)
+        return data
+
+    def _stream_steps(self, steps, source, replayable, chunk_size):
+        """
+        Chain the steps as chunk-source factories and start the last.
+
+        source is a zero-argument callable returning a fresh iterator
+        of chunks; two-pass steps call their upstream source twice.
+        """
+        for step in steps:
+            logger.info("[PIPELINE] Streaming step: %s", step_name(step))
+            source, replayable = self._step_source(step, source, replayable, chunk_size)
+        return source()
+
+    def _step_source(self, step, upstream, replayable, chunk_size):
+        if is_stateless(step):
+            return (lambda: self._map_chunks(step, upstream())), replayable
+
+        if is_mergeable(step):
+            if needs_global_state(step):
+                logger.info("[PIPELINE] Scheduling extra pass for: %s", step_name(step))
+                if not replayable:
+                    upstream, replayable = buffer_source(upstream, self._chunk_buffer), True
+                return (lambda: self._two_pass(step, upstream)), replayable
+            return (lambda: self._aggregate(step, upstream())), replayable
+
+        return (lambda: self._materialize_step(step, upstream(), chunk_size)), replayable
+
+    def _map_chunks(self, step, chunks):
+        for chunk in chunks:
+            yield self._run_step(step, "run", chunk)
+
+    def _aggregate(self, step, chunks):
+        yield step.finalize(self._reduce_state(step, chunks))
+
+    def _two_pass(self, step, upstream):
+        # Pass 1: accumulate global state. Pass 2: apply it per chunk
+        stats = step.finalize(self._reduce_state(step, upstream()))
+        for chunk in upstream():
+            yield self._run_step(step, "apply", chunk, stats)
+
+    def _reduce_state(self, step, chunks):
+        state = None
+        for chunk in chunks:
+            partial = self._run_step(step, "partial", chunk)
+            state = partial if state is None else step.merge(state, partial)
+        return state
+
+    def _materialize_step(self, step, chunks, chunk_size):
+        # The step needs global context: join, run once, re-chunk
+        result = self._run_step(step, "run", combine_chunks(chunks))
+        if isinstance(result, (list, RecordBatch)):
+            yield from iter_chunks(result, chunk_size)
+        else:
+            yield result
+
+    def _split_stateless_prefix(self):
+        steps = self.plan()
+        index = 0
+        while index < len(steps) and is_stateless(steps[index]):
+            index += 1
+        return steps[:index], steps[index:]
+
+    # --------------------------------------------------------
+    # Sharded execution
+    # --------------------------------------------------------
+
+    def _run_sharded(self, data, shard_size):
+        """
+        Run stages of stateless steps on shards via the executor.
+
+        Each stage ends at a barrier step. Mergeable barriers get
+        their partial states computed in the workers and merged
+        here; other barriers run once on the combined shards.
+        Once a step returns a non-record result (e.g. metrics),
+        the remaining steps run in this process.
+        """
+        shards = list(iter_chunks(data, shard_size))
+        head, stats = None, None
+        remaining = self.plan()
+
+        while remaining or head is not None:
+            row_steps = []
+            while remaining and is_stateless(remaining[0]):
+                row_steps.append(remaining.pop(0))
+            barrier = remaining.pop(0) if remaining else None
+
+            partial_step = barrier if barrier is not None and is_mergeable(barrier) else None
+            keep_output = partial_step is None or needs_global_state(partial_step)
+
+            logger.info(
+                "[PIPELINE] Sharded stage: %s x %d shards",
+                [step_name(step) for step in row_steps], len(shards)
+            )
+            results = self.executor.map(run_shard, [
+                (shard, self.columnar, head, stats, row_steps, partial_step, keep_output)
+                for shard in shards
+            ])
+            shards = [shard for shard, _ in results]
+            head, stats = None, None
+
+            if barrier is None:
+                break
+
+            if partial_step is not None:
+                state = None
+                for _, partial in results:
+                    state = partial if state is None else barrier.merge(state, partial)
+
+                if needs_global_state(barrier):
+                    head, stats = barrier, barrier.finalize(state)
+                    continue
+                result = barrier.finalize(state)
+            else:
+                result = self._run_step(barrier, "run", combine_chunks(shards))
+
+            if not isinstance(result, (list, RecordBatch)):
+                for step in remaining:
+                    result = self._run_step(step, "run", result)
+                return result
+            shards = list(iter_chunks(result, shard_size))
+
+        return combine_chunks(shards) if shards else self._to_native([])
+
+    # --------------------------------------------------------
+    # Step dispatch
+    # --------------------------------------------------------
+
+    def _to_native(self, data):
+        return to_native(data, self.columnar)
+
+    def _over_budget(self, data):
+        return self.memory_budget is not None and estimate_nbytes(data) > self.memory_budget
+
+    def _chunk_buffer(self):
+        """
+        Store for buffered chunks: spills over memory_budget if set.
+        """
+        if self.memory_budget is None:
+            return []
+        return SpillBuffer(self.memory_budget, self.spill_dir, self.columnar)
+
+    def _can_mutate(self, step, data, owned):
+        """
+        In-place execution is only allowed on list-of-dict records
+        that an earlier step in this run created.
+        """
+        return (
+            self.in_place
+            and owned
+            and isinstance(data, list)
+            and hasattr(step, "run_in_place")
+        )
+
+    def _run_step(self, step, method, data, *args):
+        """
+        call_step() wrapped with hooks and step metrics.
+
+        Partial-state calls are passed to hooks but not counted as
+        step output in the metrics registry.
+        """
+        for hook in self.hooks:
+            hook.before_step(step, data)
+        try:
+            result = call_step(step, method, data, *args)
+        except Exception as exc:
+            for hook in self.hooks:
+                hook.on_error(step, data, exc)
+            raise
+        if method != "partial":
+            observe_step(step, data, result)
+        for hook in reversed(self.hooks):
+            hook.after_step(step, data, result)
+        return result
+
+
+
+# ============================================================
+# DAG PIPELINE
+# ============================================================
+
+SOURCE = "input"
+
+
+class DagPipeline:
+    """
+    Steps wired as a directed acyclic graph instead of a list.
+
+    nodes maps a node name to (step, inputs), where inputs is a
+    node name or a list of them; SOURCE ("input") is the data
+    passed to run(). For example, metrics on the cleaned data and
+    on the engineered features, sharing one Cleaner run:
+
+        DagPipeline({
+            "clean":         (Cleaner(), SOURCE),
+            "scaled":        (Transformer(multiplier=2), "clean"),
+            "features":      (FeatureEngineer(), "scaled"),
+            "clean_metrics": (MetricsCalculator(), "clean"),
+            "metrics":       (MetricsCalculator(), "features"),
+        })
+
+    Every node runs once per run(), however many nodes consume it.
+    Nodes whose inputs are ready form a wave; a wave's nodes are
+    independent and run concurrently through the executor (see
+    executors.py, e.g. ThreadExecutor or ProcessExecutor).
+    """
+
+    def __init__(self, nodes, columnar=False, executor=None):
+        """
+        nodes:    dict of name -> (step, inputs)
+        columnar: convert list-of-dict input to a RecordBatch once
+        executor: optional executor; None runs nodes one by one
+                  in this process
+        """
+        self.nodes = {}
+        for name, (step, inputs) in nodes.items():
+            if name == SOURCE:
+                raise ValueError(f"Node name {SOURCE!r} is reserved for the input data")
+            self.nodes[name] = (step, [inputs] if isinstance(inputs, str) else list(inputs))
+        self.columnar = columnar
+        self.executor = executor
+        self.waves = self._schedule()
+
+    def _schedule(self):
+        """
+        Group nodes into waves: each wave depends only on earlier ones.
+        """
+        for name, (_, inputs) in self.nodes.items():
+            unknown = [node for node in inputs if node != SOURCE and node not in self.nodes]
+            if not inputs or unknown:
+                raise ValueError(f"Node {name!r} has missing or unknown inputs: {unknown or inputs}")
+
+        waves, done = [], {SOURCE}
+        remaining = list(self.nodes)
+        while remaining:
+            wave = [name for name in remaining if all(node in done for node in self.nodes[name][1])]
+            if not wave:
+                raise ValueError(f"Cycle between DAG nodes: {remaining}")
+            waves.append(wave)
+            done.update(wave)
+            remaining = [name for name in remaining if name not in done]
+        return waves
+
+    def sinks(self):
+        """
+        Nodes no other node consumes (the default outputs).
+        """
+        consumed = {node for _, inputs in self.nodes.values() for node in inputs}
+        return [name for name in self.nodes if name not in consumed]
+
+    def _needed(self, outputs):
+        needed, pending = set(), list(outputs)
+        while pending:
+            name = pending.pop()
+            if name not in needed and name != SOURCE:
+                needed.add(name)
+                pending.extend(self.nodes[name][1])
+        return needed
+
+    @log_execution
+    @timing
+    def run(self, data, outputs=None):
+        """
+        Run the graph and return a dict of node name -> result.
+
+        outputs: node names to return (default: sinks()). Only
+        nodes they depend on are run, and intermediate results are
+        released as soon as their last consumer has run.
+        """
+        outputs = self.sinks() if outputs is None else list(outputs)
+        unknown = [name for name in outputs if name not in self.nodes]
+        if unknown:
+            raise ValueError(f"Unknown DAG outputs: {unknown}")
+        needed = self._needed(outputs)
+
+        consumers = {SOURCE: 0}
+        for name in needed:
+            for node in self.nodes[name][1]:
+                consumers[node] = consumers.get(node, 0) + 1
+
+        results = {SOURCE: to_native(data, self.columnar)}
+        for wave in self.waves:
+            wave = [name for name in wave if name in needed]
+            if not wave:
+                continue
+            logger.info("[PIPELINE] DAG wave: %s", wave)
+
+            tasks = [
+                (self.nodes[name][0], [results[node] for node in self.nodes[name][1]])
+                for name in wave
+            ]
+            if self.executor is None:
+                wave_results = [run_node(task) for task in tasks]
+            else:
+                wave_results = self.executor.map(run_node, tasks)
+
+            for name, result in zip(wave, wave_results):
+                results[name] = result
+                for node in self.nodes[name][1]:
+                    consumers[node] -= 1
+                    if consumers[node] == 0 and node not in outputs:
+                        del results[node]  # last consumer done
+
+        return {name: results[name] for name in outputs}
@@ -0,0 +1,137 @@
+"""
+planner.py
+----------
+Logical query plan for a linear pipeline.
+
+Each step is described by what it declares (see processors.py):
+
+- kind:   "filter", "map" or "aggregate" (anything else is opaque)
+- reads:  record fields the step looks at
+- writes: record fields the step adds or replaces
+
+From that, LogicalPlan applies two rewrites:
+
+1. Predicate pushdown: a filter moves ahead of a per-record map
+   when the filter does not read what the map writes, or when the
+   filter only drops nulls (null_filter) and the map keeps null
+   fields null (preserves_nulls). Fewer records reach the map.
+2. Dead field elimination: a map whose written fields are never
+   read downstream is dropped. Only possible when the pipeline
+   ends in an aggregate; otherwise the caller sees every field.
+
+Steps without kind / reads / writes are never moved or dropped,
+and nothing is moved across them.
+
+Author: Anupam Bhattacharyya
+"""
+
+from collections import namedtuple
+
+from pipeline import needs_global_state, step_name
+
+
+LogicalStep = namedtuple("LogicalStep", ["step", "kind", "reads", "writes"])
+
+
+def logical_step(step):
+    kind = getattr(step, "kind", None)
+    reads = getattr(step, "reads", None)
+    writes = getattr(step, "writes", None)
+    if kind not in ("filter", "map", "aggregate") or reads is None or writes is None:
+        return LogicalStep(step, "opaque", None, None)
+    return LogicalStep(step, kind, frozenset(reads), frozenset(writes))
+
+
+def can_push_filter(map_op, filter_op):
+    """
+    True if filter_op can run before map_op with the same result.
+    """
+    if map_op.kind != "map" or needs_global_state(map_op.step):
+        return False  # a global map's state depends on every record
+
+    overlap = filter_op.reads & map_op.writes
+    if not overlap:
+        return True
+    return (
+        getattr(filter_op.step, "null_filter", False)
+        and getattr(map_op.step, "preserves_nulls", False)
+    )
+
+
+class LogicalPlan:
+    """
+    Optimized step order for a list of pipeline steps.
+
+    steps:    steps to execute, after the rewrites
+    rewrites: human-readable list of what was changed
+    """
+
+    def __init__(self, steps, optimize=True):
+        self.original = [logical_step(step) for step in steps]
+        self.optimize = optimize
+        self.rewrites = []
+        ops = list(self.original)
+        if optimize:
+            ops = self._drop_unused_maps(self._push_down_filters(ops))
+        self.ops = ops
+        self.steps = [op.step for op in ops]
+
+    def _push_down_filters(self, ops):
+        for index in range(len(ops)):
+            if ops[index].kind != "filter":
+                continue
+            position = index
+            while position > 0 and can_push_filter(ops[position - 1], ops[position]):
+                ops[position - 1], ops[position] = ops[position], ops[position - 1]
+                self.rewrites.append(
+                    f"pushed filter {step_name(ops[position - 1].step)} "
+                    f"ahead of map {step_name(ops[position].step)}"
+                )
+                position -= 1
+        return ops
+
+    def _drop_unused_maps(self, ops):
+        # Walk backwards tracking the fields still needed downstream
+        # (None = every field: the records themselves are returned)
+        live, kept = None, []
+        for op in reversed(ops):
+            if op.kind == "opaque":
+                live = None
+            elif op.kind == "aggregate":
+                live = set(op.reads)
+            elif op.kind == "map" and live is not None and op.writes and not op.writes & live:
+                self.rewrites.append(
+                    f"dropped {step_name(op.step)}: writes {', '.join(sorted(op.writes))}, "
+                    f"never read downstream"
+                )
+                continue
+            elif live is not None:
+                live |= op.reads
+            kept.append(op)
+        return kept[::-1]
+
+    def explain(self, physical=None):
+        """
+        Text description of the logical plan, the rewrites applied
+        and (if given) the physical steps actually executed.
+        """
+        def describe(ops):
+            lines = []
+            for number, op in enumerate(ops, 1):
+                line = f"  {number}. {step_name(op.step):<20} {op.kind:<9}"
+                if op.reads is not None:
+                    line += f" reads={','.join(sorted(op.reads)) or '-'}"
+                    line += f" writes={','.join(sorted(op.writes)) or '-'}"
+                lines.append(line.rstrip())
+            return lines
+
+        lines = ["== Logical plan ==", *describe(self.original), "== Rewrites =="]
+        if not self.optimize:
+            lines.append("  (optimizer disabled)")
+        else:
+            lines += [f"  - {rewrite}" for rewrite in self.rewrites] or ["  (none)"]
+        lines += ["== Optimized plan ==", *describe(self.ops)]
+        if physical is not None:
+            lines.append("== Physical plan ==")
+            lines += [f"  {number}. {step_name(step)}" for number, step in enumerate(physical, 1)]
+        return "\n".join(lines)
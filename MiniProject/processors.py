@@ -7,6 +7,17 @@ Each processor:
 - Is a class
 - Has a single responsibility
 - Exposes a run(data) method
+- Optionally exposes run_batch(batch) for columnar RecordBatch input
+- Sets stateless = True when it can process any chunk independently
+- Row-wise steps declare kind = "filter" (keep(item)) or
+  kind = "map" (map_record(item)) so the pipeline can fuse them;
+  kind = "aggregate" marks steps that reduce records to a summary
+- Global-aggregate steps expose partial / merge / finalize so
+  statistics can be accumulated across chunks or workers
+- Declares which record fields it reads and writes, so the planner
+  (see planner.py) can reorder filters and drop unused fields
+- Steps that build new records set copies_records = True and may
+  offer run_in_place(data) for records the pipeline already owns
 
 Author: Anupam Bhattacharyya
 """
@@ -43,6 +54,14 @@ class Cleaner:
     Does NOT mutate input data.
     """
 
+    # Each record is handled on its own -> safe to run chunk-by-chunk
+    stateless = True
+    kind = "filter"
+    reads = ("value",)
+    writes = ()
+    # Keeps exactly the records whose read fields are not None
+    null_filter = True
+
     @log_execution
     def run(self, data):
         # Create a NEW list (safe copy)
@@ -52,6 +71,17 @@ class Cleaner:
         ]
         return cleaned
 
+    def keep(self, item):
+        """
+        Per-record predicate, used when the step is fused.
+        """
+        return item.get("value") is not None
+
+    @log_execution
+    def run_batch(self, batch):
+        # Vectorized: keep rows whose null mask is False
+        return batch.filter(~batch.null_mask)
+
 
 # ============================================================
 # 3. TRANSFORMER
@@ -62,6 +92,14 @@ class Transformer:
     Applies transformations to data values.
     """
 
+    stateless = True
+    kind = "map"
+    reads = ("value",)
+    writes = ("value",)
+    copies_records = True
+    # A written field is None after the step iff it was None before
+    preserves_nulls = True
+
     def __init__(self, multiplier=1):
         self.multiplier = multiplier
 
@@ -75,6 +113,31 @@ class Transformer:
             for item in data
         ]
 
+    def map_record(self, item):
+        """
+        Per-record transform, used when the step is fused.
+        """
+        return {**item, "value": item["value"] * self.multiplier}
+
+    @log_execution
+    def run_in_place(self, data):
+        """
+        Mutating variant: only for records the pipeline owns.
+        """
+        multiplier = self.multiplier
+        for item in data:
+            item["value"] *= multiplier
+        return data
+
+    def map_record_in_place(self, item):
+        item["value"] *= self.multiplier
+        return item
+
+    @log_execution
+    def run_batch(self, batch):
+        # One array multiply instead of one dict per record
+        return batch.with_column("value", batch["value"] * self.multiplier)
+
 
 # ============================================================
 # 4. FEATURE ENGINEER
@@ -83,12 +146,59 @@ class Transformer:
 class FeatureEngineer:
     """
     Creates derived features (ML-style).
+
+    Normalizing needs the global max, so this step follows the
+    mergeable-state protocol and asks for a second pass:
+    - partial(chunk)          -> max of one chunk
+    - merge(state, state)     -> max of two partial states
+    - finalize(state)         -> global max
+    - apply(chunk, max_value) -> normalized records
     """
 
+    kind = "map"
+    needs_global_state = True
+    reads = ("value",)
+    writes = ("normalized_value",)
+    copies_records = True
+
     @log_execution
     def run(self, data):
-        max_value = max(item["value"] for item in data)
+        return self.apply(data, self.finalize(self.partial(data)))
+
+    @log_execution
+    def run_in_place(self, data):
+        """
+        Mutating variant: only for records the pipeline owns.
+        """
+        max_value = self.finalize(self.partial(data))
+        for item in data:
+            item["normalized_value"] = item["value"] / max_value
+        return data
+
+    @log_execution
+    def run_batch(self, batch):
+        return self.apply_batch(batch, self.finalize(self.partial_batch(batch)))
+
+    def partial(self, data):
+        return max((item["value"] for item in data), default=None)
 
+    def partial_batch(self, batch):
+        values = batch.valid_values()
+        return values.max().item() if len(values) else None
+
+    @staticmethod
+    def merge(left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        return max(left, right)
+
+    def finalize(self, state):
+        # Empty input: there is nothing to normalize, any divisor works
+        return 1 if state is None else state
+
+    def apply(self, data, max_value):
         return [
             {
                 **item,
@@ -97,6 +207,9 @@ class FeatureEngineer:
             for item in data
         ]
 
+    def apply_batch(self, batch, max_value):
+        return batch.with_column("normalized_value", batch["value"] / max_value)
+
 
 # ============================================================
 # 5. METRICS CALCULATOR
@@ -105,15 +218,69 @@ class FeatureEngineer:
 class MetricsCalculator:
     """
     Produces summary metrics from processed data.
+
+    Metrics are built from a small mergeable state
+    (count, min, max, sum), so chunks can be summarized
+    independently and combined with merge().
     """
 
+    kind = "aggregate"
+    reads = ("value",)
+    writes = ()
+
     @log_execution
     def run(self, data):
+        return self.finalize(self.partial(data))
+
+    @log_execution
+    def run_batch(self, batch):
+        return self.finalize(self.partial_batch(batch))
+
+    def partial(self, data):
         values = [item["value"] for item in data]
+        if not values:
+            return None
 
         return {
             "count": len(values),
             "min": min(values),
             "max": max(values),
-            "avg": sum(values) / len(values)
+            "sum": sum(values)
+        }
+
+    def partial_batch(self, batch):
+        values = batch.valid_values()
+        if not len(values):
+            return None
+
+        return {
+            "count": len(values),
+            "min": values.min().item(),
+            "max": values.max().item(),
+            "sum": values.sum().item()
+        }
+
+    @staticmethod
+    def merge(left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+
+        return {
+            "count": left["count"] + right["count"],
+            "min": min(left["min"], right["min"]),
+            "max": max(left["max"], right["max"]),
+            "sum": left["sum"] + right["sum"]
+        }
+
+    def finalize(self, state):
+        if state is None:
+            raise ValueError("MetricsCalculator needs at least one value")
+
+        return {
+            "count": state["count"],
+            "min": state["min"],
+            "max": state["max"],
+            "avg": state["sum"] / state["count"]
         }
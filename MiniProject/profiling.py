@@ -0,0 +1,324 @@
+"""
+profiling.py
+------------
+Per-step hooks and profiling for Pipeline.
+
+Pipeline(steps, hooks=[...]) calls, around every step it runs in
+this process:
+
+- before_step(step, data)
+- after_step(step, data, result)
+- on_error(step, data, exc)     (the exception is then re-raised)
+
+PipelineHook provides no-op versions of all three, so a hook only
+overrides what it needs. Steps run inside executor worker processes
+(sharded mode) are not seen by hooks.
+
+StepProfiler is a built-in hook that attributes time, and optionally
+memory, to pipeline steps:
+
+- mode="cprofile": deterministic, one cProfile.Profile per step
+- mode="sampling": a background thread samples the running step's
+  stack every `interval` seconds (low overhead, real stacks)
+
+Both produce collapsed stacks (flamegraph.pl / speedscope input)
+rooted at the step name, and speedscope JSON. With
+trace_memory=True each step also gets a tracemalloc snapshot diff.
+
+Author: Anupam Bhattacharyya
+"""
+
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from pipeline import step_name
+
+
+# ============================================================
+# HOOK INTERFACE
+# ============================================================
+
+class PipelineHook:
+    """
+    Base class for pipeline hooks; every method is optional.
+    """
+
+    def before_step(self, step, data):
+        pass
+
+    def after_step(self, step, data, result):
+        pass
+
+    def on_error(self, step, data, exc):
+        pass
+
+
+# ============================================================
+# STACK HELPERS
+# ============================================================
+
+def _frame_label(code, lineno=None):
+    filename = code.co_filename.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename}:{lineno or code.co_firstlineno})"
+
+
+def _pstats_label(func):
+    filename, lineno, name = func
+    if filename == "~":  # built-in
+        return name
+    return f"{name} ({filename.rsplit('/', 1)[-1]}:{lineno})"
+
+
+def _is_profiler_frame(filename, name=""):
+    # The profiler's own bookkeeping (after_step, Profile.disable)
+    return filename == __file__ or name == "<method 'disable' of '_lsprof.Profiler' objects>"
+
+
+def _frame_depth(frame):
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def pstats_to_stacks(stats, root, max_depth=64):
+    """
+    Approximate collapsed stacks from a cProfile call graph.
+
+    cProfile only records caller -> callee edges, so each callee's
+    time is split across its callers in proportion to the time
+    spent on each edge. Weights are in microseconds.
+    """
+    entries = stats.stats
+    children = {}
+    for callee, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((callee, edge[3]))
+
+    stacks = Counter()
+
+    def walk(func, path, scale):
+        _, _, own_time, total_time, _ = entries[func]
+        if own_time * scale > 0:
+            stacks[path] += int(own_time * scale * 1e6)
+        if len(path) >= max_depth:
+            return
+        for child, edge_time in children.get(func, ()):
+            child_total = entries[child][3]
+            if child_total <= 0 or _pstats_label(child) in path:
+                continue  # no time, or recursion
+            walk(child, path + (_pstats_label(child),), scale * edge_time / child_total)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers and not _is_profiler_frame(func[0], func[2]):
+            walk(func, (root, _pstats_label(func)), 1.0)
+    return stacks
+
+
+# ============================================================
+# PROFILER HOOK
+# ============================================================
+
+class StepProfiler(PipelineHook):
+    """
+    Attribute time (and optionally memory) to pipeline steps.
+
+    mode:         "cprofile" or "sampling"
+    interval:     seconds between samples in sampling mode
+    trace_memory: take tracemalloc snapshots around each step
+    top:          allocation sites kept per step in memory reports
+
+    Results accumulate across runs and chunks, keyed by step name.
+    """
+
+    def __init__(self, mode="cprofile", interval=0.001, trace_memory=False, top=10):
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.trace_memory = trace_memory
+        self.top = top
+
+        self.profiles = {}      # step name -> cProfile.Profile
+        self.samples = Counter()  # stack tuple -> microseconds
+        self.memory = {}        # step name -> memory report
+        self._active = {}       # thread id -> per-step state
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Hook methods
+    # --------------------------------------------------------
+
+    def before_step(self, step, data):
+        name = step_name(step)
+        state = {"name": name}
+        self._active[threading.get_ident()] = state
+
+        if self.trace_memory:
+            state["started_tracing"] = not tracemalloc.is_tracing()
+            if state["started_tracing"]:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            state["snapshot"] = tracemalloc.take_snapshot()
+            state["traced"] = tracemalloc.get_traced_memory()[0]
+
+        if self.mode == "cprofile":
+            profile = self.profiles.get(name)
+            if profile is None:
+                profile = self.profiles[name] = cProfile.Profile()
+            state["profile"] = profile
+            profile.enable()
+        else:
+            # Frames below this depth belong to the pipeline, not the step
+            state["depth"] = _frame_depth(sys._getframe(1))
+            state["stop"] = threading.Event()
+            state["sampler"] = threading.Thread(
+                target=self._sample, args=(threading.get_ident(), state),
+                name=f"profiler-{name}", daemon=True
+            )
+            state["sampler"].start()
+
+    def after_step(self, step, data, result):
+        self._finish()
+
+    def on_error(self, step, data, exc):
+        self._finish()
+
+    def _finish(self):
+        state = self._active.pop(threading.get_ident(), None)
+        if state is None:
+            return
+
+        if self.mode == "cprofile":
+            state["profile"].disable()
+        else:
+            state["stop"].set()
+            state["sampler"].join()
+
+        if self.trace_memory:
+            self._record_memory(state)
+
+    # --------------------------------------------------------
+    # Sampling
+    # --------------------------------------------------------
+
+    def _sample(self, thread_id, state):
+        root, depth = state["name"], state["depth"]
+        last = time.perf_counter()
+        while not state["stop"].wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+
+            frames = []
+            while frame is not None:
+                frames.append((frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+            frames = frames[::-1][depth:]
+
+            if frames and not _is_profiler_frame(frames[0][0].co_filename):
+                stack = (root,) + tuple(_frame_label(code, line) for code, line in frames)
+                with self._lock:
+                    self.samples[stack] += int((now - last) * 1e6)
+            last = now
+
+    # --------------------------------------------------------
+    # Memory
+    # --------------------------------------------------------
+
+    def _record_memory(self, state):
+        current, peak = tracemalloc.get_traced_memory()
+        diff = tracemalloc.take_snapshot().compare_to(state["snapshot"], "lineno")
+        if state["started_tracing"]:
+            tracemalloc.stop()
+
+        with self._lock:
+            report = self.memory.setdefault(
+                state["name"], {"calls": 0, "net_bytes": 0, "peak_bytes": 0, "top": []}
+            )
+            report["calls"] += 1
+            report["net_bytes"] += current - state["traced"]
+            report["peak_bytes"] = max(report["peak_bytes"], peak - state["traced"])
+            report["top"] = [str(stat) for stat in diff[:self.top]]
+
+    # --------------------------------------------------------
+    # Reports
+    # --------------------------------------------------------
+
+    def stacks(self):
+        """
+        Counter of stack tuple (step name first) -> microseconds.
+        """
+        if self.mode == "sampling":
+            return Counter(self.samples)
+
+        stacks = Counter()
+        for name, profile in self.profiles.items():
+            stacks.update(pstats_to_stacks(pstats.Stats(profile), name))
+        return stacks
+
+    def stats(self, name):
+        """
+        pstats.Stats for one step (cprofile mode only).
+        """
+        return pstats.Stats(self.profiles[name])
+
+    def collapsed(self):
+        """
+        Collapsed stack text: "step;frame;frame weight" per line.
+        """
+        return "\n".join(
+            f"{';'.join(stack)} {weight}"
+            for stack, weight in sorted(self.stacks().items()) if weight > 0
+        )
+
+    def speedscope(self, name="pipeline"):
+        """
+        Speedscope JSON document (one sampled profile, one stack
+        per line of collapsed(), step names as root frames).
+        """
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, weight in sorted(self.stacks().items()):
+            if weight <= 0:
+                continue
+            ids = []
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append({"name": label})
+                ids.append(index[label])
+            samples.append(ids)
+            weights.append(weight)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "pipeline.StepProfiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "microseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def write_collapsed(self, path):
+        with open(path, "w") as file:
+            file.write(self.collapsed() + "\n")
+
+    def write_speedscope(self, path, name="pipeline"):
+        with open(path, "w") as file:
+            json.dump(self.speedscope(name), file)
@@ -0,0 +1,190 @@
+"""
+records.py
+----------
+Columnar record representation for the pipeline.
+
+A RecordBatch stores one NumPy array per field instead of one dict
+per record, so processors can work on whole columns at once.
+
+- Each field is a 1-D array of the same length
+- Missing "value" entries are tracked in a boolean null mask
+- Conversion to / from list of dicts happens only at the boundary
+
+NumPy is optional for the project: it is only needed, and only
+imported, once a batch is actually built, so list-of-dict pipelines
+do not pay its import time at startup.
+
+Author: Anupam Bhattacharyya
+"""
+
+np = None  # imported on first use by _require_numpy()
+
+
+VALUE_FIELD = "value"
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - depends on environment
+            raise ImportError(
+                "RecordBatch requires NumPy. Install it with: pip install numpy"
+            ) from None
+        np = numpy
+    return np
+
+
+class RecordBatch:
+    """
+    Struct-of-arrays container for pipeline records.
+
+    columns:   dict of field name -> NumPy array
+    null_mask: boolean array, True where "value" is missing
+    """
+
+    __slots__ = ("columns", "null_mask")
+
+    def __init__(self, columns, null_mask=None):
+        _require_numpy()
+        self.columns = dict(columns)
+
+        length = len(self)
+        if any(len(col) != length for col in self.columns.values()):
+            raise ValueError("All RecordBatch columns must have the same length")
+
+        if null_mask is None:
+            null_mask = np.zeros(length, dtype=bool)
+        self.null_mask = null_mask
+
+    # --------------------------------------------------------
+    # Boundary conversion
+    # --------------------------------------------------------
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a batch from a list of dicts (one pass per field).
+        """
+        _require_numpy()
+        records = list(records)
+
+        # Preserve first-seen field order across all records
+        fields = list(dict.fromkeys(key for item in records for key in item))
+        if VALUE_FIELD not in fields:
+            fields.append(VALUE_FIELD)
+
+        raw_values = [item.get(VALUE_FIELD) for item in records]
+        null_mask = np.fromiter(
+            (value is None for value in raw_values),
+            dtype=bool,
+            count=len(records)
+        )
+
+        columns = {}
+        for field in fields:
+            if field == VALUE_FIELD:
+                # Nulls are tracked in the mask; store a neutral 0 in their slot
+                filled = [0 if value is None else value for value in raw_values]
+                columns[field] = np.asarray(filled) if filled else np.empty(0)
+            else:
+                columns[field] = np.asarray([item.get(field) for item in records])
+
+        return cls(columns, null_mask)
+
+    def to_records(self):
+        """
+        Convert back to a list of dicts with plain Python values.
+        """
+        names = list(self.columns)
+        lists = [self.columns[name].tolist() for name in names]
+        value_index = names.index(VALUE_FIELD) if VALUE_FIELD in names else None
+
+        records = []
+        for row, is_null in zip(zip(*lists), self.null_mask.tolist()):
+            item = dict(zip(names, row))
+            if is_null and value_index is not None:
+                item[VALUE_FIELD] = None
+            records.append(item)
+        return records
+
+    # --------------------------------------------------------
+    # Column access
+    # --------------------------------------------------------
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def fields(self):
+        return list(self.columns)
+
+    @property
+    def nbytes(self):
+        """
+        Bytes held by the column arrays and the null mask.
+        """
+        return sum(col.nbytes for col in self.columns.values()) + self.null_mask.nbytes
+
+    def valid_values(self):
+        """
+        "value" column with null entries removed.
+        """
+        return self.columns[VALUE_FIELD][~self.null_mask]
+
+    # --------------------------------------------------------
+    # Derived batches (never mutate self)
+    # --------------------------------------------------------
+
+    def filter(self, keep):
+        """
+        Return a new batch with only rows where keep is True.
+        """
+        return RecordBatch(
+            {name: col[keep] for name, col in self.columns.items()},
+            self.null_mask[keep]
+        )
+
+    def with_column(self, name, array):
+        """
+        Return a new batch with a column added or replaced.
+
+        Other columns are shared, not copied.
+        """
+        columns = dict(self.columns)
+        columns[name] = array
+        return RecordBatch(columns, self.null_mask)
+
+    def slice(self, start, stop):
+        """
+        Return a zero-copy view of rows [start, stop).
+        """
+        return RecordBatch(
+            {name: col[start:stop] for name, col in self.columns.items()},
+            self.null_mask[start:stop]
+        )
+
+    @classmethod
+    def concat(cls, batches):
+        """
+        Concatenate batches that share the same fields.
+        """
+        _require_numpy()
+        batches = list(batches)
+        if not batches:
+            return cls({VALUE_FIELD: np.empty(0)})
+
+        names = batches[0].fields
+        return cls(
+            {name: np.concatenate([b.columns[name] for b in batches]) for name in names},
+            np.concatenate([b.null_mask for b in batches])
+        )
+
+    def __repr__(self):
+        return f"RecordBatch(rows={len(self)}, fields={self.fields})"
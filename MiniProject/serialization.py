@@ -0,0 +1,225 @@
+"""
+serialization.py
+----------------
+JSON serialization for records and pipeline results.
+
+The fastest installed backend is used:
+- orjson  (fastest; native NumPy support)
+- msgspec
+- json    (stdlib fallback, always available)
+
+PIPELINE_JSON_BACKEND=json|orjson|msgspec in the environment forces
+one. Every backend encodes to bytes, understands NumPy scalars /
+arrays and RecordBatches (as lists of records) and writes NaN /
+Infinity as null, so output is valid JSON whichever is installed.
+
+Also provided:
+- NDJSON streaming: encode_ndjson / write_ndjson / iter_ndjson
+- RecordSchema: decodes JSON lines straight into list-of-dict
+  records or a typed RecordBatch (no dtype inference pass)
+
+Author: Anupam Bhattacharyya
+"""
+
+import importlib
+import json
+import math
+import os
+
+from records import VALUE_FIELD, RecordBatch, _require_numpy
+
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _default(obj):
+    """
+    Fallback encoder for types JSON does not know.
+    """
+    if isinstance(obj, RecordBatch):
+        return obj.to_records()
+    if hasattr(obj, "tolist"):  # NumPy scalar or array
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj):
+    """
+    Copy of obj with non-finite floats replaced by None (what orjson
+    and msgspec write for them).
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    return _finite(_default(obj))
+
+
+def _select_backend():
+    forced = os.environ.get("PIPELINE_JSON_BACKEND")
+    if forced and forced not in BACKENDS:
+        raise ValueError(f"PIPELINE_JSON_BACKEND must be one of {BACKENDS}, got {forced!r}")
+
+    for name in ([forced] if forced else BACKENDS):
+        try:
+            return name, importlib.import_module(name)
+        except ImportError:
+            if forced:
+                raise
+    raise ImportError("No JSON backend available")  # unreachable: json is stdlib
+
+
+BACKEND, _module = _select_backend()
+
+
+# ============================================================
+# ENCODE / DECODE
+# ============================================================
+
+if BACKEND == "orjson":
+    _OPTIONS = _module.OPT_SERIALIZE_NUMPY | _module.OPT_NON_STR_KEYS
+
+    def dumps(obj, indent=False):
+        """
+        Encode obj to JSON bytes (indent=True: pretty-printed).
+        """
+        options = _OPTIONS | (_module.OPT_INDENT_2 if indent else 0)
+        return _module.dumps(obj, default=_default, option=options)
+
+    def _dumps_line(obj):
+        return _module.dumps(obj, default=_default, option=_OPTIONS | _module.OPT_APPEND_NEWLINE)
+
+    loads = _module.loads
+
+elif BACKEND == "msgspec":
+    _encoder = _module.json.Encoder(enc_hook=_default)
+
+    def dumps(obj, indent=False):
+        data = _encoder.encode(obj)
+        return _module.json.format(data, indent=2) if indent else data
+
+    def _dumps_line(obj):
+        return _encoder.encode(obj) + b"\n"
+
+    loads = _module.json.Decoder().decode
+
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(",", ":"), allow_nan=False)
+    _pretty_encoder = json.JSONEncoder(default=_default, indent=2, allow_nan=False)
+    _decoder = json.JSONDecoder()
+
+    def _encode(encoder, obj):
+        try:
+            return encoder.encode(obj)
+        except ValueError:
+            # NaN / Infinity somewhere: rare, so only then pay for a copy
+            return encoder.encode(_finite(obj))
+
+    def dumps(obj, indent=False):
+        return _encode(_pretty_encoder if indent else _encoder, obj).encode()
+
+    def _dumps_line(obj):
+        return (_encode(_encoder, obj) + "\n").encode()
+
+    def loads(data):
+        # JSONDecoder.decode skips json.loads' per-call encoding sniffing
+        return _decoder.decode(data.decode() if isinstance(data, (bytes, bytearray)) else data)
+
+
+# ============================================================
+# NDJSON STREAMING
+# ============================================================
+
+def _records(data):
+    return data.to_records() if isinstance(data, RecordBatch) else data
+
+
+def encode_ndjson(records):
+    """
+    Encode records (list of dicts or RecordBatch) as NDJSON bytes.
+    """
+    return b"".join(map(_dumps_line, _records(records)))
+
+
+def write_ndjson(file, records):
+    """
+    Append records to a binary file object; returns records written.
+    """
+    records = _records(records)
+    file.write(encode_ndjson(records))
+    return len(records)
+
+
+def iter_ndjson(lines):
+    """
+    Lazily decode an iterable of NDJSON lines (e.g. a binary file);
+    blank lines are skipped.
+    """
+    for line in lines:
+        if line.strip():
+            yield loads(line)
+
+
+# ============================================================
+# SCHEMA-AWARE DECODING
+# ============================================================
+
+class RecordSchema:
+    """
+    Expected record fields and their Python types.
+
+        schema = RecordSchema({"id": int, "value": float})
+
+    Decoded records always have exactly these fields (missing ones
+    are None). decode_batch() builds each column with its declared
+    dtype directly, instead of RecordBatch.from_records inferring
+    fields and types from the data.
+    """
+
+    DTYPES = {int: "int64", float: "float64", bool: "bool", str: "str"}
+
+    def __init__(self, fields):
+        unknown = [name for name, kind in fields.items() if kind not in self.DTYPES]
+        if unknown:
+            raise TypeError(f"Unsupported field types for {unknown}; use int, float, bool or str")
+        self.fields = dict(fields)
+
+    def decode_records(self, lines):
+        """
+        NDJSON lines -> list of dicts with the schema's fields, coerced.
+        """
+        fields = list(self.fields.items())
+        return [
+            {
+                name: None if (value := item.get(name)) is None else kind(value)
+                for name, kind in fields
+            }
+            for item in iter_ndjson(lines)
+        ]
+
+    def decode_batch(self, lines):
+        """
+        NDJSON lines -> RecordBatch with one typed column per field.
+
+        Nulls in "value" go to the null mask; in other fields they
+        become the type's zero value.
+        """
+        np = _require_numpy()
+        items = list(iter_ndjson(lines))
+        count = len(items)
+
+        columns, null_mask = {}, None
+        for name, kind in self.fields.items():
+            raw = [item.get(name) for item in items]
+            if name == VALUE_FIELD:
+                null_mask = np.fromiter((value is None for value in raw), dtype=bool, count=count)
+            filled = [kind() if value is None else value for value in raw]
+            if kind is str:
+                columns[name] = np.array(filled, dtype=str)
+            else:
+                columns[name] = np.fromiter(filled, dtype=self.DTYPES[kind], count=count)
+        return RecordBatch(columns, null_mask)
@@ -0,0 +1,173 @@
+"""
+spill.py
+--------
+Spill-to-disk for intermediate pipeline results.
+
+When a Pipeline has a memory_budget, intermediate data that would
+exceed it is written to a temporary checkpoint:
+
+- columnar pipelines use the binary columnar format of file_io.py,
+  read back through mmap: the next step gets RecordBatch views
+  straight onto the file pages, with no parse pass, and the OS can
+  drop those pages under memory pressure
+- list-of-dict pipelines pickle each chunk, so records come back
+  exactly as they were (types, missing fields); the file is private
+  to the process (mkstemp, mode 0o600) and only read back by it
+
+- estimate_nbytes(data): approximate in-memory size of a chunk
+- SpillBuffer: replayable chunk store that keeps chunks in memory
+  up to the budget and appends the rest to a checkpoint file
+
+Checkpoint files are deleted when the buffer is closed or garbage
+collected; arrays already handed out stay valid (on POSIX, unlinked
+files remain mapped).
+
+Author: Anupam Bhattacharyya
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import weakref
+
+from decorators import logger
+from file_io import ColumnarSink, read_columnar_blocks
+from records import RecordBatch
+
+
+SAMPLE_RECORDS = 100
+
+
+def estimate_nbytes(data):
+    """
+    Approximate bytes held by a RecordBatch or list of dicts.
+
+    Lists are estimated from their first SAMPLE_RECORDS records
+    (dict + keys are shared, values are counted).
+    """
+    if isinstance(data, RecordBatch):
+        return data.nbytes
+    if not isinstance(data, list) or not data:
+        return 0
+
+    sample = data[:SAMPLE_RECORDS]
+    sample_bytes = sum(
+        sys.getsizeof(item) + sum(sys.getsizeof(value) for value in item.values())
+        for item in sample
+    )
+    return sys.getsizeof(data) + sample_bytes * len(data) // len(sample)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _PickleSink:
+    """
+    Appends one pickled chunk per write() to an open file.
+    """
+
+    def __init__(self, file):
+        self._file = file
+
+    def write(self, chunk):
+        # dumps first: a chunk that fails to pickle leaves no partial frame
+        self._file.write(pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def close(self):
+        self._file.close()
+
+
+def _read_pickled(path):
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+class SpillBuffer:
+    """
+    Replayable chunk store bounded by memory_budget bytes.
+
+    Chunks are kept in memory until the budget would be exceeded;
+    from then on every chunk goes to a checkpoint file (columnar if
+    columnar, else pickled chunks), so iteration order is preserved.
+    Iterating yields the memory chunks, then the spilled ones.
+    """
+
+    def __init__(self, memory_budget, directory=None, columnar=False):
+        self.memory_budget = memory_budget
+        self.directory = directory
+        self.columnar = columnar
+        self.chunks = []
+        self.memory_bytes = 0
+        self.spilled_rows = 0
+        self.path = None
+        self._sink = None
+        self._finalizer = None
+
+    def append(self, chunk):
+        if self._sink is None:
+            size = estimate_nbytes(chunk)
+            if self.memory_bytes + size <= self.memory_budget:
+                self.chunks.append(chunk)
+                self.memory_bytes += size
+                return
+            self._open()
+
+        try:
+            self._sink.write(chunk)
+        except (TypeError, pickle.PicklingError) as exc:
+            # No fixed-width columns / not picklable: keep in memory
+            logger.warning("[SPILL] Cannot spill chunk, keeping it in memory: %s", exc)
+            self._close_sink()
+            self.chunks.extend(self._read_spilled())
+            self.chunks.append(chunk)
+            self.close()
+            self.memory_budget = float("inf")
+            return
+        self.spilled_rows += len(chunk)
+
+    def _open(self):
+        suffix = ".pcol" if self.columnar else ".pkl"
+        fd, self.path = tempfile.mkstemp(dir=self.directory, prefix="spill-", suffix=suffix)
+        self._finalizer = weakref.finalize(self, _remove_quietly, self.path)
+        if self.columnar:
+            os.close(fd)
+            self._sink = ColumnarSink(self.path)
+        else:
+            self._sink = _PickleSink(os.fdopen(fd, "wb"))
+        logger.info("[SPILL] Spilling chunks to %s", self.path)
+
+    def _close_sink(self):
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _read_spilled(self):
+        if self.path is None or not self.spilled_rows:
+            return
+        if self.columnar:
+            yield from read_columnar_blocks(self.path)
+        else:
+            yield from _read_pickled(self.path)
+
+    def __iter__(self):
+        self._close_sink()  # flush; nothing is appended once replay starts
+        yield from self.chunks
+        yield from self._read_spilled()
+
+    def close(self):
+        """
+        Delete the checkpoint file (mapped arrays stay readable).
+        """
+        self._close_sink()
+        if self._finalizer is not None:
+            self._finalizer()
+            self.path = self._finalizer = None
@@ -0,0 +1,216 @@
+"""
+step_cache.py
+-------------
+Persistent, content-addressed cache for pipeline step outputs.
+
+Keys are chained:
+- the input key is a hash of the input data
+- each step's key = hash(previous key + step class + parameters)
+
+So an unchanged input run through an unchanged step always maps
+to the same file, and Pipeline.run can resume from the last step
+whose output is already on disk.
+
+Outputs are never pickled, so a planted cache file cannot run code:
+RecordBatches are stored in the binary columnar format of file_io.py
+and other values as JSON (only if they round-trip unchanged; anything
+else is simply not cached). Files are written atomically. Total size
+is bounded; least recently used files are evicted first.
+
+The default directory is per user (under $XDG_CACHE_HOME or
+~/.cache) and created with mode 0o700; a directory owned by another
+user or writable by others is refused.
+
+Author: Anupam Bhattacharyya
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import struct
+import tempfile
+
+from decorators import logger
+from file_io import ColumnarSink, read_columnar_blocks
+from records import RecordBatch
+from serialization import dumps, loads
+
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "pipeline_step_cache"
+)
+
+BATCH_SUFFIX = ".pcol"
+JSON_SUFFIX = ".json"
+
+
+# ============================================================
+# FINGERPRINTS
+# ============================================================
+
+def fingerprint_data(data):
+    """
+    Stable hash of a list of records, a RecordBatch or any picklable
+    value.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(data, RecordBatch):
+        digest.update(b"batch")
+        for name, column in data.columns.items():
+            digest.update(name.encode())
+            digest.update(str(column.dtype).encode())
+            digest.update(column.tobytes())
+        digest.update(data.null_mask.tobytes())
+    else:
+        digest.update(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def fingerprint_step(step):
+    """
+    Identify a step by class path and parameters.
+
+    Steps may define cache_key() to control this; composite steps
+    (with a .steps list, e.g. FusedStep) combine their children.
+    """
+    if hasattr(step, "cache_key"):
+        return str(step.cache_key())
+
+    cls = step.__class__
+    if hasattr(step, "steps"):
+        parts = [fingerprint_step(child) for child in step.steps]
+    else:
+        params = getattr(step, "__dict__", {})
+        parts = [f"{name}={value!r}" for name, value in sorted(params.items())]
+    return f"{cls.__module__}.{cls.__qualname__}({','.join(parts)})"
+
+
+def chain_key(previous_key, step):
+    """
+    Key of step's output given the key of its input.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(previous_key.encode())
+    digest.update(fingerprint_step(step).encode())
+    return digest.hexdigest()
+
+
+# ============================================================
+# DISK STORE
+# ============================================================
+
+def secure_directory(directory):
+    """
+    Create directory with mode 0o700 if missing, and refuse one that
+    another user owns or can write to.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Cache path is not a directory: {directory}")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Cache directory is owned by another user: {directory}")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Cache directory is writable by other users: {directory}")
+
+
+class StepCache:
+    """
+    Size-bounded directory of step outputs keyed by chained hash.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        secure_directory(directory)
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + BATCH_SUFFIX, base + JSON_SUFFIX
+
+    def __contains__(self, key):
+        return any(map(os.path.exists, self._paths(key)))
+
+    def get(self, key):
+        """
+        Return (True, value) if cached, else (False, None).
+        """
+        batch_path, json_path = self._paths(key)
+        try:
+            if os.path.exists(batch_path):
+                path = batch_path
+                # concat copies out of the mapping: callers get writable arrays
+                value = RecordBatch.concat(read_columnar_blocks(path))
+            else:
+                path = json_path
+                with open(path, "rb") as file:
+                    value = loads(file.read())
+        except FileNotFoundError:
+            return False, None
+        except (ValueError, KeyError, TypeError, OSError, struct.error):
+            # Corrupt / truncated entry: drop it and recompute
+            self._remove(path)
+            return False, None
+
+        os.utime(path)  # mark as recently used for eviction
+        return True, value
+
+    def put(self, key, value):
+        batch_path, json_path = self._paths(key)
+        if isinstance(value, RecordBatch):
+            if not len(value) or any(col.dtype.hasobject for col in value.columns.values()):
+                logger.info("[CACHE] Not caching batch without fixed-width columns: %s", key)
+                return
+            # ColumnarSink writes path + ".tmp" and renames it on close
+            with ColumnarSink(batch_path) as sink:
+                sink.write(value)
+        else:
+            try:
+                data = dumps(value)
+                exact = loads(data) == value
+            except (TypeError, ValueError, OverflowError):
+                exact = False
+            if not exact:
+                logger.info("[CACHE] Not caching value that JSON cannot round-trip: %s", key)
+                return
+            # Write to a temp file first so readers never see partial data
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, json_path)
+            except BaseException:
+                self._remove(tmp_path)
+                raise
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until under max_bytes.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((BATCH_SUFFIX, JSON_SUFFIX)):
+                info = entry.stat()
+                entries.append((info.st_mtime, info.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((BATCH_SUFFIX, JSON_SUFFIX, ".tmp")):
+                self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,8 @@
+"""
+Make the flat MiniProject modules importable from the tests.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
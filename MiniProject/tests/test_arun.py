@@ -0,0 +1,99 @@
+"""
+Pipeline.arun must not leave the source running when a step fails.
+"""
+
+import asyncio
+
+import pytest
+
+from ingestion import IngestionScheduler, SourceRegistry, ingest_stream
+from pipeline import Pipeline
+from processors import Cleaner, Transformer
+
+
+class FailingStep:
+
+    stateless = True
+
+    def __init__(self, fail_at=2):
+        self.fail_at = fail_at
+        self.calls = 0
+
+    def run(self, data):
+        self.calls += 1
+        if self.calls == self.fail_at:
+            raise RuntimeError("step failed")
+        return data
+
+
+def test_step_failure_closes_source():
+    state = {"closed": False, "produced": 0}
+
+    async def batches():
+        try:
+            for index in range(100):
+                state["produced"] += 1
+                yield [{"id": index, "value": index}]
+        finally:
+            state["closed"] = True
+
+    async def main():
+        with pytest.raises(RuntimeError, match="step failed"):
+            await Pipeline([FailingStep()]).arun(batches(), max_pending=1)
+        current = asyncio.current_task()
+        return [task for task in asyncio.all_tasks() if task is not current]
+
+    leftover = asyncio.run(main())
+    assert leftover == []
+    assert state["closed"]
+    assert state["produced"] < 100
+
+
+def test_step_failure_cancels_pending_fetches():
+    registry = SourceRegistry()
+
+    state = {"slow_cancelled": False}
+
+    @registry.register("fast")
+    async def fast():
+        return [{"id": 1, "value": 1}]
+
+    @registry.register("slow")
+    async def slow():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            state["slow_cancelled"] = True
+            raise
+        return []
+
+    async def main():
+        stream = ingest_stream(IngestionScheduler(registry))
+        with pytest.raises(RuntimeError, match="step failed"):
+            await Pipeline([FailingStep(fail_at=1)]).arun(stream, max_pending=1)
+        current = asyncio.current_task()
+        return [task for task in asyncio.all_tasks() if task is not current]
+
+    assert asyncio.run(main()) == []
+    assert state["slow_cancelled"]
+
+
+def test_source_error_is_raised():
+    async def batches():
+        yield [{"id": 1, "value": 1}]
+        raise ConnectionError("source failed")
+
+    async def main():
+        await Pipeline([Cleaner(), Transformer(multiplier=2)]).arun(batches(), max_pending=1)
+
+    with pytest.raises(ConnectionError, match="source failed"):
+        asyncio.run(main())
+
+
+def test_normal_run():
+    async def batches():
+        for index in range(10):
+            yield [{"id": index, "value": index}]
+
+    result = asyncio.run(Pipeline([Transformer(multiplier=2)]).arun(batches(), max_pending=1))
+    assert result == [{"id": index, "value": index * 2} for index in range(10)]
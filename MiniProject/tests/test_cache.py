@@ -0,0 +1,89 @@
+"""
+Single-flight behaviour of the async cached() wrapper.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from cache import cached
+
+
+def make_slow(delay=0.05):
+    calls = []
+
+    @cached()
+    async def slow(x):
+        calls.append(x)
+        await asyncio.sleep(delay)
+        return x * 2
+
+    return slow, calls
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    slow, calls = make_slow()
+
+    async def main():
+        leader = asyncio.ensure_future(slow(1))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(slow(1))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter, leader
+
+    value, leader = asyncio.run(main())
+    assert value == 2
+    assert leader.cancelled()
+    assert calls == [1]
+    assert slow.cache_info().currsize == 1
+
+
+def test_concurrent_callers_share_one_call():
+    slow, calls = make_slow()
+
+    async def main():
+        return await asyncio.gather(*(slow(3) for _ in range(5)))
+
+    assert asyncio.run(main()) == [6] * 5
+    assert calls == [3]
+    assert slow.cache_info().hits == 4
+
+
+def test_callers_on_different_event_loops():
+    slow, _ = make_slow()
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(asyncio.run(slow(5)))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert results == [10] * 4
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    calls = []
+
+    @cached()
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(failing() for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main()))
+    with pytest.raises(ValueError):
+        asyncio.run(failing())
+    assert len(calls) == 2
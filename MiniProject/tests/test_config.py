@@ -0,0 +1,20 @@
+"""
+Pipeline.from_config options.
+"""
+
+from pipeline import Pipeline
+from processors import FeatureEngineer, MetricsCalculator
+
+STEPS = ["processors.Cleaner", "processors.FeatureEngineer", "processors.MetricsCalculator"]
+
+
+def test_optimize_can_be_turned_off():
+    # FeatureEngineer's output is unused by MetricsCalculator: the
+    # optimizer drops it, a non-optimized pipeline keeps it
+    optimized = Pipeline.from_config({"steps": STEPS})
+    plain = Pipeline.from_config({"steps": STEPS, "optimize": False})
+
+    assert plain.optimize is False
+    assert not any(isinstance(step, FeatureEngineer) for step in optimized.plan())
+    assert any(isinstance(step, FeatureEngineer) for step in plain.plan())
+    assert isinstance(plain.plan()[-1], MetricsCalculator)
@@ -0,0 +1,153 @@
+"""
+Deduplicator / ExternalDeduplicator and deduplicated ingestion.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from dedup import RESOLVERS, Deduplicator, ExternalDeduplicator
+from ingestion import IngestionScheduler, SourceRegistry, ingest_all_sources, ingest_stream
+from records import RecordBatch
+
+
+OVERLAPPING = [
+    {"id": 1, "value": 10, "source": "a"},
+    {"id": 2, "value": None, "source": "a"},
+    {"id": 1, "value": None, "source": "b", "extra": 7},
+    {"id": 2, "value": 20, "source": "b"},
+    {"id": 3, "value": 30, "source": "b"},
+]
+
+
+def test_latest():
+    assert Deduplicator(resolve="latest").run(OVERLAPPING) == [
+        {"id": 1, "value": None, "source": "b", "extra": 7},
+        {"id": 2, "value": 20, "source": "b"},
+        {"id": 3, "value": 30, "source": "b"},
+    ]
+
+
+def test_first():
+    assert Deduplicator(resolve="first").run(OVERLAPPING) == [
+        {"id": 1, "value": 10, "source": "a"},
+        {"id": 2, "value": None, "source": "a"},
+        {"id": 3, "value": 30, "source": "b"},
+    ]
+
+
+def test_first_non_null():
+    assert Deduplicator(resolve="first_non_null").run(OVERLAPPING) == [
+        {"id": 1, "value": 10, "source": "a", "extra": 7},
+        {"id": 2, "value": 20, "source": "a"},
+        {"id": 3, "value": 30, "source": "b"},
+    ]
+
+
+def test_callable_resolver():
+    def add_values(kept, new):
+        return {**kept, "value": (kept["value"] or 0) + (new["value"] or 0)}
+
+    result = Deduplicator(resolve=add_values).run(OVERLAPPING)
+    assert [item["value"] for item in result] == [10, 20, 30]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        Deduplicator(resolve="newest")
+
+
+@pytest.mark.parametrize("make", [Deduplicator, ExternalDeduplicator])
+def test_records_without_id_pass_through(make, tmp_path):
+    records = [
+        {"value": 1},
+        {"id": 1, "value": 2},
+        {"id": None, "value": 3},
+        {"id": 1, "value": 4},
+        {"value": 1},
+    ]
+    options = {"spill_dir": str(tmp_path), "partitions": 3} if make is ExternalDeduplicator else {}
+
+    assert make(resolve="first", **options).run(records) == [
+        {"value": 1}, {"id": 1, "value": 2}, {"id": None, "value": 3}, {"value": 1}
+    ]
+
+
+def random_records(count=2000, seed=11):
+    rng = random.Random(seed)
+    records = []
+    for position in range(count):
+        item = {"value": None if rng.random() < 0.3 else rng.randint(0, 100), "n": position}
+        if rng.random() > 0.05:
+            item["id"] = rng.randint(0, count // 4)
+        if rng.random() < 0.2:
+            item["tag"] = rng.choice(["x", "y", None])
+        records.append(item)
+    return records
+
+
+@pytest.mark.parametrize("resolve", list(RESOLVERS))
+def test_external_matches_in_memory(resolve, tmp_path):
+    records = random_records()
+    expected = Deduplicator(resolve=resolve).run(records)
+    external = ExternalDeduplicator(resolve=resolve, partitions=7, spill_dir=str(tmp_path))
+
+    assert external.run(records) == expected
+    assert len(expected) < len(records)
+    assert list(tmp_path.iterdir()) == []  # spill files removed
+
+
+def test_run_batch():
+    batch = RecordBatch.from_records([{"id": 1, "value": 1}, {"id": 1, "value": 2}, {"id": 2, "value": 3}])
+
+    result = Deduplicator(resolve="latest").run_batch(batch)
+    assert result.to_records() == [{"id": 1, "value": 2}, {"id": 2, "value": 3}]
+
+
+# ------------------------------------------------------------
+# ingestion
+# ------------------------------------------------------------
+
+SOURCES = {
+    "a": [{"id": 1, "value": 10}, {"id": 2, "value": None}],
+    "b": [{"id": 2, "value": 20}, {"id": 3, "value": None}],
+    "c": [{"id": 3, "value": 30}, {"id": 1, "value": None}, {"id": 4, "value": 40}],
+}
+
+
+def make_scheduler():
+    # Sources finish in registration order, so arrival order is fixed
+    registry = SourceRegistry()
+    for delay, (name, records) in enumerate(SOURCES.items()):
+        async def fetch(records=records, delay=delay):
+            await asyncio.sleep(0.01 * delay)
+            return [dict(item) for item in records]
+        registry.register(name, fetch)
+    return IngestionScheduler(registry)
+
+
+def all_records():
+    return [item for records in SOURCES.values() for item in records]
+
+
+async def collect(stream):
+    return [batch async for batch in stream]
+
+
+def test_stream_first_matches_merged_result():
+    batches = asyncio.run(collect(ingest_stream(make_scheduler(), Deduplicator(resolve="first"))))
+    merged = asyncio.run(ingest_all_sources(make_scheduler(), Deduplicator(resolve="first")))
+
+    assert len(batches) == 3  # one per source, streamed as they land
+    assert [item for batch in batches for item in batch] == merged
+    assert merged == Deduplicator(resolve="first").run(all_records())
+
+
+@pytest.mark.parametrize("resolve", ["latest", "first_non_null"])
+def test_stream_other_policies_yield_one_merged_batch(resolve):
+    batches = asyncio.run(collect(ingest_stream(make_scheduler(), Deduplicator(resolve=resolve))))
+    merged = asyncio.run(ingest_all_sources(make_scheduler(), Deduplicator(resolve=resolve)))
+
+    assert batches == [merged]
+    assert merged == Deduplicator(resolve=resolve).run(all_records())
@@ -0,0 +1,232 @@
+"""
+HttpClient / HttpSource against a local http.server.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from http_source import (
+    ConnectionPool,
+    HttpClient,
+    HttpSource,
+    RetryableHttpError,
+    register_http_source,
+)
+from ingestion import IngestionScheduler, SourceRegistry
+from pipeline import Pipeline
+from processors import Cleaner, Transformer
+
+
+PAGES = [
+    [{"id": 1, "value": 10}, {"id": 2, "value": None}],
+    [{"id": 3, "value": 30}],
+    [{"id": 4, "value": 40}, {"id": 5, "value": 50}],
+]
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        page = int(query.get("page", ["0"])[0])
+        route = getattr(self, "route_" + parts.path.strip("/"), None)
+        if route is None:
+            self.send_json({"error": "not found"}, status=404)
+        else:
+            route(page)
+
+    def send_json(self, payload, status=200, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route_pages(self, page):
+        next_url = f"/pages?page={page + 1}" if page + 1 < len(PAGES) else None
+        self.send_json({"records": PAGES[page], "next": next_url})
+
+    def route_link(self, page):
+        headers = []
+        if page + 1 < len(PAGES):
+            headers.append(("Link", f'</link?page={page + 1}>; rel="next"'))
+        self.send_json(PAGES[page], headers=headers)
+
+    def route_chunked(self, page):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        body = json.dumps({"records": PAGES[0] + PAGES[1]}).encode()
+        for start in range(0, len(body), 7):
+            piece = body[start:start + 7]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def route_flaky(self, page):
+        state = self.server.state
+        state["flaky_calls"] += 1
+        if state["flaky_calls"] == 1:
+            self.send_json({"error": "busy"}, status=503)
+        else:
+            self.send_json({"records": PAGES[0], "next": None})
+
+    def route_slow(self, page):
+        state = self.server.state
+        with state["lock"]:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        time.sleep(0.05)
+        with state["lock"]:
+            state["active"] -= 1
+        self.send_json({"records": [], "next": None})
+
+    def route_empty(self, page):
+        self.send_response(204)
+        self.end_headers()
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.state = {"flaky_calls": 0, "active": 0, "max_active": 0, "lock": threading.Lock()}
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    host, port = httpd.server_address
+    httpd.base_url = f"http://{host}:{port}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def all_records():
+    return [item for page in PAGES for item in page]
+
+
+def test_pages_reuse_one_connection(server):
+    async def main():
+        async with HttpClient() as client:
+            records = await HttpSource(f"{server.base_url}/pages", client).fetch()
+            return records, client.pool.opened
+
+    records, opened = asyncio.run(main())
+    assert records == all_records()
+    assert opened == 1
+
+
+def test_link_header_pagination(server):
+    async def main():
+        async with HttpClient() as client:
+            source = HttpSource(f"{server.base_url}/link", client, records_key=None)
+            return [page async for page in source]
+
+    assert asyncio.run(main()) == PAGES
+
+
+def test_chunked_body(server):
+    async def main():
+        async with HttpClient() as client:
+            first = await client.get(f"{server.base_url}/chunked")
+            second = await client.get(f"{server.base_url}/chunked")
+            return first, second, client.pool.opened
+
+    first, second, opened = asyncio.run(main())
+    assert first.json() == second.json() == {"records": PAGES[0] + PAGES[1]}
+    assert opened == 1  # chunked framing leaves the connection reusable
+
+
+def test_503_raises_retryable_error(server):
+    async def main():
+        async with HttpClient() as client:
+            await client.get(f"{server.base_url}/flaky")
+
+    with pytest.raises(RetryableHttpError) as info:
+        asyncio.run(main())
+    assert info.value.status == 503
+
+
+def test_source_retries_503(server):
+    async def main():
+        async with HttpClient() as client:
+            return await HttpSource(f"{server.base_url}/flaky", client).fetch()
+
+    assert asyncio.run(main()) == PAGES[0]
+    assert server.state["flaky_calls"] == 2
+
+
+def test_no_content_response_has_empty_body(server):
+    async def main():
+        async with HttpClient(timeout=2.0) as client:
+            started = time.monotonic()
+            response = await client.get(f"{server.base_url}/empty")
+            elapsed = time.monotonic() - started
+            after = await client.get(f"{server.base_url}/pages")
+            return response, elapsed, after, client.pool.opened
+
+    response, elapsed, after, opened = asyncio.run(main())
+    assert response.status == 204 and response.body == b""
+    assert elapsed < 1.0  # must not wait for the request timeout
+    assert after.json()["records"] == PAGES[0]
+    assert opened == 1
+
+
+def test_per_host_limit(server):
+    async def main():
+        pool = ConnectionPool(max_per_host=2)
+        async with HttpClient(pool) as client:
+            await asyncio.gather(*(client.get(f"{server.base_url}/slow") for _ in range(8)))
+            return pool.opened
+
+    opened = asyncio.run(main())
+    assert server.state["max_active"] <= 2
+    assert opened <= 2
+
+
+def test_arun_over_http_source(server):
+    async def main():
+        async with HttpClient() as client:
+            source = HttpSource(f"{server.base_url}/pages", client)
+            return await Pipeline([Cleaner(), Transformer(multiplier=2)]).arun(source)
+
+    result = asyncio.run(main())
+    expected = [
+        {**item, "value": item["value"] * 2} for item in all_records() if item["value"] is not None
+    ]
+    assert result == expected
+
+
+def test_registered_rate_limit_applies_to_every_page(server):
+    registry = SourceRegistry()
+    client = HttpClient()
+    source = register_http_source(
+        registry, "paged", f"{server.base_url}/pages", client, rate_limit=20, burst=1
+    )
+
+    async def main():
+        async with client:
+            started = time.monotonic()
+            results = await IngestionScheduler(registry).run()
+            return results, time.monotonic() - started
+
+    (result,), elapsed = asyncio.run(main())
+    assert registry.get("paged").bucket is None
+    assert source.bucket is not None
+    assert result.records == all_records()
+    # 3 pages at 20/s with burst 1: the 2nd and 3rd wait ~50ms each
+    assert elapsed >= 0.09
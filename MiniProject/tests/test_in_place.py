@@ -0,0 +1,81 @@
+"""
+In-place execution must give the same results as copy mode and
+never mutate records the caller can still see.
+"""
+
+import copy
+
+import pytest
+
+from pipeline import Pipeline
+from processors import Cleaner, FeatureEngineer, MetricsCalculator, Transformer
+from synthetic import make_records
+
+
+STEP_ORDERS = {
+    "lone transformer": lambda: [Transformer(multiplier=3)],
+    "lone feature engineer": lambda: [FeatureEngineer()],
+    "cleaner+transformer": lambda: [Cleaner(), Transformer(multiplier=2)],
+    "transformer+transformer": lambda: [Transformer(multiplier=2), Transformer(multiplier=5)],
+    "transformer, feature engineer": lambda: [Transformer(multiplier=2), FeatureEngineer()],
+    "full": lambda: [Cleaner(), Transformer(multiplier=2), FeatureEngineer(), MetricsCalculator()],
+    "feature engineer first": lambda: [Cleaner(), FeatureEngineer(), Transformer(multiplier=4)],
+}
+
+
+def make_input(steps):
+    # Only pipelines that start by cleaning can take null values
+    null_ratio = 0.2 if isinstance(steps[0], Cleaner) else 0.0
+    return make_records(200, null_ratio=null_ratio, seed=7)
+
+
+@pytest.mark.parametrize("fuse", [True, False], ids=["fused", "unfused"])
+@pytest.mark.parametrize("order", list(STEP_ORDERS))
+def test_in_place_matches_copy_mode_and_keeps_input(order, fuse):
+    data = make_input(STEP_ORDERS[order]())
+    snapshot = copy.deepcopy(data)
+
+    expected = Pipeline(STEP_ORDERS[order](), fuse=fuse).run(copy.deepcopy(data))
+    result = Pipeline(STEP_ORDERS[order](), fuse=fuse, in_place=True).run(data)
+
+    assert result == expected
+    assert data == snapshot
+
+
+@pytest.mark.parametrize("order", list(STEP_ORDERS))
+def test_in_place_streaming_keeps_input(order):
+    data = make_input(STEP_ORDERS[order]())
+    snapshot = copy.deepcopy(data)
+
+    expected = Pipeline(STEP_ORDERS[order]()).run(copy.deepcopy(data), chunk_size=32)
+    result = Pipeline(STEP_ORDERS[order](), in_place=True).run(data, chunk_size=32)
+
+    assert result == expected
+    assert data == snapshot
+
+
+def test_in_place_result_does_not_alias_input():
+    data = make_records(50, null_ratio=0.0)
+    result = Pipeline([Transformer(multiplier=2), FeatureEngineer()], in_place=True).run(data)
+
+    assert not any(out is item for out, item in zip(result, data))
+
+
+@pytest.mark.parametrize(
+    "order, method",
+    [("transformer, feature engineer", "run_in_place"), ("transformer+transformer", "map_record_in_place")],
+)
+def test_in_place_path_is_taken(order, method, monkeypatch):
+    steps = STEP_ORDERS[order]()
+    owner = FeatureEngineer if method == "run_in_place" else Transformer
+    calls = []
+    original = getattr(owner, method)
+
+    def spy(self, *args):
+        calls.append(method)
+        return original(self, *args)
+
+    monkeypatch.setattr(owner, method, spy)
+    Pipeline(steps, in_place=True).run(make_input(steps))
+
+    assert calls
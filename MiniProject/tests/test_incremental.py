@@ -0,0 +1,116 @@
+"""
+IncrementalPipeline row retention.
+"""
+
+import pytest
+
+from incremental import IncrementalPipeline
+from pipeline import Pipeline
+from processors import Cleaner, FeatureEngineer, MetricsCalculator, Transformer
+from synthetic import make_records
+
+
+def deltas(count=5, rows=100):
+    return [make_records(rows, seed=seed) for seed in range(count)]
+
+
+@pytest.mark.parametrize("make_steps", [
+    lambda: [Cleaner(), Transformer(multiplier=2), MetricsCalculator()],
+    lambda: [Cleaner(), FeatureEngineer(), MetricsCalculator()],
+], ids=["stateless", "global-state"])
+def test_stable_aggregate_keeps_no_rows(make_steps):
+    incremental = IncrementalPipeline(make_steps())
+    seen = []
+    for delta in deltas():
+        result = incremental.update(delta)
+        seen += delta
+
+    assert not incremental.keep_rows
+    assert incremental.chunks == []
+    assert result == Pipeline(make_steps(), optimize=False).run(seen)
+    with pytest.raises(ValueError):
+        incremental.rows()
+
+
+def test_keep_rows_option():
+    steps = [Cleaner(), Transformer(multiplier=2), MetricsCalculator()]
+    incremental = IncrementalPipeline(steps, keep_rows=True)
+    seen = []
+    for delta in deltas():
+        incremental.update(delta)
+        seen += delta
+
+    assert incremental.rows() == Pipeline([Cleaner(), Transformer(multiplier=2)]).run(seen)
+
+
+class WeightByNormalized:
+    """
+    A map that reads the field FeatureEngineer writes.
+    """
+
+    stateless = True
+    kind = "map"
+    reads = ("value", "normalized_value")
+    writes = ("value",)
+
+    def run(self, data):
+        return [{**item, "value": item["value"] * item["normalized_value"]} for item in data]
+
+
+class Undeclared:
+    """
+    Declares nothing about the fields it touches.
+    """
+
+    stateless = True
+
+    def run(self, data):
+        return data
+
+
+@pytest.mark.parametrize("between", [
+    lambda: [Transformer(multiplier=2)],
+    lambda: [Transformer(multiplier=2), Cleaner(), Transformer(multiplier=3)],  # fused
+], ids=["single", "fused"])
+def test_steps_between_that_ignore_global_fields_stay_stable(between):
+    def make_steps():
+        return [Cleaner(), FeatureEngineer(), *between(), MetricsCalculator()]
+
+    incremental = IncrementalPipeline(make_steps())
+    seen = []
+    for delta in deltas():
+        result = incremental.update(delta)
+        seen += delta
+
+    assert incremental.aggregate_is_stable
+    assert incremental.chunks == []
+    assert result == Pipeline(make_steps(), optimize=False).run(seen)
+
+
+@pytest.mark.parametrize("between", [WeightByNormalized, Undeclared])
+def test_rows_needed_by_unstable_aggregate(between):
+    def make_steps():
+        return [Cleaner(), FeatureEngineer(), between(), MetricsCalculator()]
+
+    with pytest.raises(ValueError):
+        IncrementalPipeline(make_steps(), keep_rows=False)
+
+    incremental = IncrementalPipeline(make_steps(), fuse=False)
+    seen = []
+    for delta in deltas():
+        result = incremental.update(delta)
+        seen += delta
+
+    assert not incremental.aggregate_is_stable
+    assert incremental.keep_rows
+    assert result == Pipeline(make_steps(), optimize=False, fuse=False).run(seen)
+
+
+def test_rows_without_aggregate():
+    incremental = IncrementalPipeline([Cleaner(), FeatureEngineer()])
+    seen = []
+    for delta in deltas():
+        incremental.update(delta)
+        seen += delta
+
+    assert incremental.rows() == Pipeline([Cleaner(), FeatureEngineer()]).run(seen)
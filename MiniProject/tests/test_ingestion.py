@@ -0,0 +1,17 @@
+"""
+Ingestion results are fresh on every run.
+"""
+
+import asyncio
+
+from ingestion import fetch_source_a, ingest_all_sources
+
+
+def test_fetchers_return_independent_records():
+    async def main():
+        first = await fetch_source_a()
+        first[0]["value"] = 12345
+        return await ingest_all_sources()
+
+    result = asyncio.run(main())
+    assert all(item["value"] != 12345 for item in result)
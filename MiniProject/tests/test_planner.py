@@ -0,0 +1,123 @@
+"""
+LogicalPlan rewrites: filter pushdown and unused map elimination.
+"""
+
+from pipeline import Pipeline
+from planner import LogicalPlan
+from processors import Cleaner, FeatureEngineer, MetricsCalculator, Transformer
+from synthetic import make_records
+
+
+class Opaque:
+    """
+    A step that declares nothing: the planner must treat it as a barrier.
+    """
+
+    def run(self, data):
+        return data
+
+
+class PositiveFilter:
+    """
+    Reads "value" but does not only drop nulls.
+    """
+
+    kind = "filter"
+    reads = ("value",)
+    writes = ()
+
+    def keep(self, item):
+        return item["value"] is not None and item["value"] > 500
+
+    def run(self, data):
+        return [item for item in data if self.keep(item)]
+
+
+def names(steps):
+    return [type(step).__name__ for step in steps]
+
+
+def test_null_filter_pushed_ahead_of_null_preserving_map():
+    plan = LogicalPlan([Transformer(multiplier=2), Cleaner()])
+
+    assert names(plan.steps) == ["Cleaner", "Transformer"]
+    assert plan.rewrites == ["pushed filter Cleaner ahead of map Transformer"]
+
+
+def test_filter_reading_written_field_stays_behind_map():
+    plan = LogicalPlan([Transformer(multiplier=2), PositiveFilter()])
+
+    assert names(plan.steps) == ["Transformer", "PositiveFilter"]
+    assert plan.rewrites == []
+
+
+def test_no_pushdown_past_global_state_map():
+    # FeatureEngineer's max depends on every record it sees
+    plan = LogicalPlan([FeatureEngineer(), Cleaner()])
+
+    assert names(plan.steps) == ["FeatureEngineer", "Cleaner"]
+
+
+def test_opaque_step_is_a_barrier():
+    plan = LogicalPlan([Transformer(multiplier=2), Opaque(), Cleaner()])
+    assert names(plan.steps) == ["Transformer", "Opaque", "Cleaner"]
+
+    plan = LogicalPlan([Cleaner(), FeatureEngineer(), Opaque(), MetricsCalculator()])
+    assert names(plan.steps) == ["Cleaner", "FeatureEngineer", "Opaque", "MetricsCalculator"]
+
+
+def test_unused_map_dropped_only_before_an_aggregate():
+    with_aggregate = LogicalPlan([Cleaner(), FeatureEngineer(), MetricsCalculator()])
+    assert names(with_aggregate.steps) == ["Cleaner", "MetricsCalculator"]
+
+    records_out = LogicalPlan([Cleaner(), FeatureEngineer()])
+    assert names(records_out.steps) == ["Cleaner", "FeatureEngineer"]
+
+
+def test_map_read_by_aggregate_is_kept():
+    plan = LogicalPlan([Cleaner(), Transformer(multiplier=2), MetricsCalculator()])
+
+    assert names(plan.steps) == ["Cleaner", "Transformer", "MetricsCalculator"]
+
+
+def test_optimized_results_match():
+    data = make_records(1000, seed=3)
+
+    def steps():
+        return [Cleaner(), Transformer(multiplier=2), FeatureEngineer(), MetricsCalculator()]
+
+    assert Pipeline(steps()).run(data) == Pipeline(steps(), optimize=False).run(data)
+
+
+def test_explain():
+    text = Pipeline(
+        [Transformer(multiplier=2), Cleaner(), FeatureEngineer(), MetricsCalculator()]
+    ).explain()
+
+    assert text.splitlines() == [
+        "== Logical plan ==",
+        "  1. Transformer          map       reads=value writes=value",
+        "  2. Cleaner              filter    reads=value writes=-",
+        "  3. FeatureEngineer      map       reads=value writes=normalized_value",
+        "  4. MetricsCalculator    aggregate reads=value writes=-",
+        "== Rewrites ==",
+        "  - pushed filter Cleaner ahead of map Transformer",
+        "  - dropped FeatureEngineer: writes normalized_value, never read downstream",
+        "== Optimized plan ==",
+        "  1. Cleaner              filter    reads=value writes=-",
+        "  2. Transformer          map       reads=value writes=value",
+        "  3. MetricsCalculator    aggregate reads=value writes=-",
+        "== Physical plan ==",
+        "  1. Cleaner+Transformer",
+        "  2. MetricsCalculator",
+    ]
+
+
+def test_explain_with_optimizer_disabled():
+    text = Pipeline([Transformer(multiplier=2), Cleaner()], optimize=False).explain()
+
+    assert "  (optimizer disabled)" in text
+    assert text.split("== Optimized plan ==")[1].splitlines()[1:3] == [
+        "  1. Transformer          map       reads=value writes=value",
+        "  2. Cleaner              filter    reads=value writes=-",
+    ]
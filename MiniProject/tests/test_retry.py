@@ -0,0 +1,190 @@
+"""
+retry() and CircuitBreaker.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from decorators import CircuitBreaker, CircuitOpenError, retry
+
+
+class Flaky:
+    """
+    Fails with `error` for the first `failures` calls.
+    """
+
+    def __init__(self, failures, error=ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def call(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("upstream down")
+        return "ok"
+
+
+# ------------------------------------------------------------
+# retry
+# ------------------------------------------------------------
+
+def test_sync_retry_until_success():
+    flaky = Flaky(2)
+    assert retry(max_attempts=3, base_delay=0, retry_on=(ConnectionError,))(flaky.call)() == "ok"
+    assert flaky.calls == 3
+
+
+def test_gives_up_after_max_attempts():
+    flaky = Flaky(5)
+    with pytest.raises(ConnectionError):
+        retry(max_attempts=3, base_delay=0, retry_on=(ConnectionError,))(flaky.call)()
+    assert flaky.calls == 3
+
+
+def test_non_retryable_error_is_raised_at_once():
+    flaky = Flaky(1, error=ValueError)
+    with pytest.raises(ValueError):
+        retry(max_attempts=3, base_delay=0, retry_on=(ConnectionError,))(flaky.call)()
+    assert flaky.calls == 1
+
+
+def test_async_retry_until_success():
+    flaky = Flaky(2)
+
+    @retry(max_attempts=3, base_delay=0, retry_on=(ConnectionError,))
+    async def call():
+        return flaky.call()
+
+    assert asyncio.run(call()) == "ok"
+    assert flaky.calls == 3
+
+
+def test_deadline_cancels_slow_attempt():
+    @retry(max_attempts=5, base_delay=0, deadline=0.1, retry_on=(asyncio.TimeoutError,))
+    async def slow():
+        await asyncio.sleep(10)
+
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(slow())
+    assert time.monotonic() - started < 1.0
+
+
+def test_deadline_stops_retries_whose_backoff_would_exceed_it():
+    flaky = Flaky(10)
+
+    @retry(max_attempts=10, base_delay=1.0, jitter=False, deadline=0.5,
+           retry_on=(ConnectionError,))
+    async def call():
+        return flaky.call()
+
+    started = time.monotonic()
+    with pytest.raises(ConnectionError):
+        asyncio.run(call())
+    assert flaky.calls == 1
+    assert time.monotonic() - started < 0.5
+
+
+# ------------------------------------------------------------
+# circuit breaker
+# ------------------------------------------------------------
+
+def open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    flaky = Flaky(10)
+    call = retry(max_attempts=1, retry_on=(ConnectionError,), breaker=breaker)(flaky.call)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            call()
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        call()
+    assert flaky.calls == 2  # the upstream was not called
+
+
+def test_half_open_success_closes():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+
+    call = retry(max_attempts=1, retry_on=(ConnectionError,), breaker=breaker)(Flaky(0).call)
+    assert call() == "ok"
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_half_open_failure_reopens():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    call = retry(max_attempts=1, retry_on=(ConnectionError,), breaker=breaker)(Flaky(1).call)
+    with pytest.raises(ConnectionError):
+        call()
+    assert breaker.state == "open"
+
+
+def test_half_open_admits_a_single_trial():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    calls = []
+
+    @retry(max_attempts=1, retry_on=(ConnectionError,), breaker=breaker)
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        return await asyncio.gather(*(call() for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert results.count("ok") == 1
+    assert sum(isinstance(result, CircuitOpenError) for result in results) == 4
+    assert len(calls) == 1
+    assert breaker.state == "closed"
+
+
+def test_trial_without_outcome_frees_the_slot():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    @retry(max_attempts=1, retry_on=(ConnectionError,), breaker=breaker)
+    def not_retryable():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        not_retryable()
+    assert breaker.state == "half-open"
+    assert retry(max_attempts=1, breaker=breaker)(Flaky(0).call)() == "ok"
+    assert breaker.state == "closed"
+
+
+def test_cancelled_trial_frees_the_slot():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    @retry(max_attempts=1, retry_on=(ConnectionError,), breaker=breaker)
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.ensure_future(hang())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        breaker.before_call()  # a new trial is admitted
+
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Every JSON backend must produce the same, valid JSON.
+"""
+
+import importlib.util
+import json
+import math
+
+import pytest
+
+import serialization
+from synthetic import make_batch
+
+
+def load_backend(name, monkeypatch):
+    """
+    A separate copy of serialization.py bound to one backend.
+    """
+    pytest.importorskip(name)
+    monkeypatch.setenv("PIPELINE_JSON_BACKEND", name)
+    spec = importlib.util.spec_from_file_location(f"serialization_{name}", serialization.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.BACKEND == name
+    return module
+
+
+def strict_loads(data):
+    def reject(constant):
+        raise ValueError(f"Invalid JSON constant {constant}")
+    return json.loads(data, parse_constant=reject)
+
+
+@pytest.fixture(params=serialization.BACKENDS)
+def backend(request, monkeypatch):
+    return load_backend(request.param, monkeypatch)
+
+
+def test_non_finite_floats_become_null(backend):
+    records = [{"id": 1, "value": math.nan}, {"id": 2, "value": [math.inf, -math.inf, 1.5]}]
+
+    assert backend.encode_ndjson(records) == (
+        b'{"id":1,"value":null}\n{"id":2,"value":[null,null,1.5]}\n'
+    )
+    assert strict_loads(backend.dumps(records, indent=True)) == [
+        {"id": 1, "value": None}, {"id": 2, "value": [None, None, 1.5]}
+    ]
+
+
+def test_numpy_values(backend):
+    np = pytest.importorskip("numpy")
+    payload = {"array": np.array([1.0, np.nan]), "scalar": np.float64(np.inf), "count": np.int64(3)}
+
+    assert strict_loads(backend.dumps(payload)) == {"array": [1.0, None], "scalar": None, "count": 3}
+
+
+def test_record_batch_round_trip(backend):
+    batch = make_batch(20)
+    lines = backend.encode_ndjson(batch).splitlines()
+
+    assert list(backend.iter_ndjson(lines)) == batch.to_records()
+
+
+def test_backends_agree(monkeypatch):
+    records = [{"id": i, "value": None if i % 3 else i / 7} for i in range(50)]
+    records.append({"id": -1, "value": math.nan})
+    outputs = {
+        name: load_backend(name, monkeypatch).encode_ndjson(records)
+        for name in serialization.BACKENDS
+        if importlib.util.find_spec(name) is not None
+    }
+
+    assert len(set(outputs.values())) == 1, outputs
@@ -0,0 +1,61 @@
+"""
+Spilling over a memory budget must not change the output.
+"""
+
+from pipeline import Pipeline
+from processors import Cleaner, FeatureEngineer, Transformer
+from spill import SpillBuffer
+from synthetic import make_batch
+
+
+def mixed_records(with_optional_field=False):
+    # ints and floats in one column; optionally a field only some records have
+    records = [{"id": i, "value": i if i % 2 else i + 0.5} for i in range(2000)]
+    if with_optional_field:
+        for item in records[::3]:
+            item["score"] = 1
+    return records
+
+
+def test_spill_keeps_dict_records_exact(tmp_path):
+    def steps():
+        return [Cleaner(), Transformer(multiplier=2), FeatureEngineer()]
+
+    expected = Pipeline(steps()).run(mixed_records())
+    result = Pipeline(steps(), memory_budget=1000, spill_dir=str(tmp_path)).run(mixed_records())
+
+    assert result == expected
+    assert [type(item["value"]) for item in result] == [type(item["value"]) for item in expected]
+
+
+def test_spill_buffer_round_trips_chunks(tmp_path):
+    records = mixed_records(with_optional_field=True)
+    chunks = [records[start:start + 500] for start in range(0, 2000, 500)]
+    buffer = SpillBuffer(0, str(tmp_path))
+    for chunk in chunks:
+        buffer.append(chunk)
+
+    assert buffer.spilled_rows == 2000
+    assert list(buffer) == chunks
+    buffer.close()
+    assert not list(tmp_path.iterdir())
+
+
+def test_spill_columnar(tmp_path):
+    batch = make_batch(5000)
+    expected = Pipeline([Transformer(multiplier=3)], columnar=True).run(batch, as_records=True)
+    pipeline = Pipeline([Transformer(multiplier=3)], columnar=True, memory_budget=1000,
+                        spill_dir=str(tmp_path))
+
+    assert pipeline.run(batch, chunk_size=1000, as_records=True) == expected
+
+
+def test_from_config_accepts_memory_budget(tmp_path):
+    pipeline = Pipeline.from_config({
+        "steps": ["processors.Transformer"],
+        "memory_budget": 1000,
+        "spill_dir": str(tmp_path),
+    })
+
+    assert pipeline.memory_budget == 1000
+    assert pipeline.spill_dir == str(tmp_path)
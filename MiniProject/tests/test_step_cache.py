@@ -0,0 +1,85 @@
+"""
+StepCache storage and directory checks.
+"""
+
+import os
+
+import pytest
+
+from pipeline import Pipeline
+from processors import Cleaner, MetricsCalculator, Transformer
+from step_cache import StepCache
+from synthetic import make_batch, make_records
+
+
+def test_private_directory(tmp_path):
+    cache = StepCache(str(tmp_path / "cache"))
+
+    assert os.stat(cache.directory).st_mode & 0o777 == 0o700
+
+
+def test_refuses_directory_writable_by_others(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+
+    with pytest.raises(PermissionError):
+        StepCache(str(shared))
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["records", "columnar"])
+def test_cached_run_matches_fresh_run(tmp_path, columnar):
+    cache = StepCache(str(tmp_path / "cache"))
+    data = make_batch(500) if columnar else make_records(500)
+
+    def run(step_cache=None):
+        steps = [Cleaner(), Transformer(multiplier=2)]
+        return Pipeline(steps, columnar=columnar, step_cache=step_cache).run(data, as_records=True)
+
+    expected = run()
+    assert run(cache) == expected
+    assert run(cache) == expected  # served from the cache
+    assert not any(name.endswith(".pkl") for name in os.listdir(cache.directory))
+
+
+def test_values_json_cannot_round_trip_are_not_cached(tmp_path):
+    cache = StepCache(str(tmp_path / "cache"))
+    cache.put("tuple", {"pair": (1, 2)})
+    cache.put("metrics", {"count": 2, "avg": 1.5})
+
+    assert cache.get("tuple") == (False, None)
+    assert cache.get("metrics") == (True, {"count": 2, "avg": 1.5})
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = StepCache(str(tmp_path / "cache"))
+    data = make_records(50, null_ratio=0.0)
+    Pipeline([Transformer(multiplier=2), MetricsCalculator()], step_cache=cache).run(data)
+    for name in os.listdir(cache.directory):
+        with open(os.path.join(cache.directory, name), "wb") as file:
+            file.write(b"\x80garbage")
+
+    result = Pipeline([Transformer(multiplier=2), MetricsCalculator()], step_cache=cache).run(data)
+    assert result == Pipeline([Transformer(multiplier=2), MetricsCalculator()]).run(data)
+
+
+@pytest.mark.parametrize("keep_bytes", [0, 10, 20, 100, -8], ids=lambda n: f"truncated-{n}")
+def test_truncated_columnar_entry_is_a_miss(tmp_path, keep_bytes):
+    cache = StepCache(str(tmp_path / "cache"))
+    batch = make_batch(500)
+
+    def run():
+        steps = [Cleaner(), Transformer(multiplier=2)]
+        return Pipeline(steps, columnar=True, step_cache=cache).run(batch, as_records=True)
+
+    expected = run()
+    entries = [name for name in os.listdir(cache.directory) if name.endswith(".pcol")]
+    assert entries
+    for name in entries:
+        path = os.path.join(cache.directory, name)
+        size = os.path.getsize(path)
+        os.truncate(path, keep_bytes if keep_bytes >= 0 else size + keep_bytes)
+
+    assert run() == expected
+    # the broken entries were dropped and written again
+    assert all(os.path.getsize(os.path.join(cache.directory, name)) > 100 for name in entries)